@@ -1,5 +1,4 @@
 """Ollama Agent with Mem0 Integration"""
-import ollama
 from datetime import datetime
 from typing import Optional, Dict, List
 from mem0_layer import Mem0Layer
@@ -70,6 +69,7 @@ Be helpful, curious, and let your personality grow naturally through interaction
         messages.append({"role": "user", "content": user_message})
 
         # Get response from Ollama
+        import ollama  # Deferred so /soul and startup don't pay for it
         response = ollama.chat(
             model=self.model,
             messages=messages
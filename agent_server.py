@@ -0,0 +1,386 @@
+"""HTTP serving mode for SimpleAgent (stdlib asyncio, JSON in and out)
+
+Endpoints:
+    POST /chat     {"message": "...", "user_id": "...", "history": [...]}
+    POST /learn    {"fact": "...", "category": "...", "user_id": "..."}
+    POST /task     {"task": "...", "outcome": "...", "user_id": "..."}
+    POST /search   {"query": "...", "limit": 5, "include_archive": false, "user_id": "..."}
+    GET  /stats    ?user_id=...
+    GET  /health
+
+Work is pushed onto a bounded queue drained by a fixed number of workers
+(matched to Ollama's parallel slots). When the queue is full the server
+answers 429 straight away so a load balancer can retry elsewhere.
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+
+from simple_agent import SimpleAgent
+from simple_memory import MemoryManager
+from llm_client import get_client
+from config import (OLLAMA_MODEL, DEFAULT_USER_ID, HISTORY_WINDOW, SERVER_HOST, SERVER_PORT,
+                    SERVER_CONCURRENCY, SERVER_QUEUE_SIZE, SERVER_MAX_BODY)
+
+IDLE_TIMEOUT = 30  # Seconds a keep-alive connection may sit idle
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """Error that maps directly to an HTTP status code"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AgentServer:
+    """Serve SimpleAgent over HTTP with bounded concurrency and backpressure"""
+
+    def __init__(self, host: str = SERVER_HOST, port: int = SERVER_PORT,
+                 concurrency: int = SERVER_CONCURRENCY, queue_size: int = SERVER_QUEUE_SIZE,
+                 model: str = OLLAMA_MODEL, memories: Optional[MemoryManager] = None):
+        """Initialize the server (call start() or serve_forever() to listen)"""
+        self.host = host
+        self.port = port
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(1, queue_size)
+        self.model = model
+        self.memories = memories if memories is not None else MemoryManager()
+
+        # Agent calls are blocking, so workers hand them to a thread pool
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                           thread_name_prefix="agent-worker")
+        self.queue: Optional[asyncio.Queue] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.workers: List[asyncio.Task] = []
+
+        self.routes: Dict[str, Callable[[Dict], Dict]] = {
+            "/chat": self.handle_chat,
+            "/learn": self.handle_learn,
+            "/task": self.handle_task,
+            "/search": self.handle_search,
+        }
+
+        self.started_at = time.time()
+        self.counters = {"requests": 0, "completed": 0, "rejected": 0, "errors": 0}
+        self.busy = 0
+
+    # Request handlers (run on worker threads)
+
+    def _agent(self, memory, history: Any = None) -> SimpleAgent:
+        """Build a lightweight agent around a user's store"""
+        agent = SimpleAgent(self.model, memory=memory)
+        agent.show_thinking = False
+
+        if history:
+            if not isinstance(history, list) or not all(
+                    isinstance(m, dict) and m.get("role") in ("user", "assistant")
+                    and isinstance(m.get("content"), str) for m in history):
+                raise HTTPError(400, "history must be a list of {role, content} messages")
+            agent.conversation_history.extend(
+                {"role": m["role"], "content": m["content"]} for m in history[-HISTORY_WINDOW:])
+        return agent
+
+    def handle_chat(self, payload: Dict) -> Dict:
+        """POST /chat"""
+        message = _require(payload, "message")
+        user_id = payload.get("user_id") or DEFAULT_USER_ID
+
+        with self.memories.session(user_id) as memory:
+            agent = self._agent(memory, payload.get("history"))
+            response, soul_updated, compacted = agent.chat(
+                message,
+                save_to_memory=bool(payload.get("save_to_memory", True)),
+                include_context=bool(payload.get("include_context", True))
+            )
+
+        return {"user_id": user_id, "response": response,
+                "soul_updated": soul_updated, "compacted": compacted}
+
+    def handle_learn(self, payload: Dict) -> Dict:
+        """POST /learn"""
+        fact = _require(payload, "fact")
+        user_id = payload.get("user_id") or DEFAULT_USER_ID
+
+        with self.memories.session(user_id) as memory:
+            message, soul_updated, compacted = self._agent(memory).learn_fact(
+                fact, payload.get("category"))
+
+        return {"user_id": user_id, "message": message,
+                "soul_updated": soul_updated, "compacted": compacted}
+
+    def handle_task(self, payload: Dict) -> Dict:
+        """POST /task"""
+        task = _require(payload, "task")
+        user_id = payload.get("user_id") or DEFAULT_USER_ID
+
+        with self.memories.session(user_id) as memory:
+            message, soul_updated, compacted = self._agent(memory).complete_task(
+                task, payload.get("outcome"))
+
+        return {"user_id": user_id, "message": message,
+                "soul_updated": soul_updated, "compacted": compacted}
+
+    def handle_search(self, payload: Dict) -> Dict:
+        """POST /search"""
+        query = _require(payload, "query")
+        user_id = payload.get("user_id") or DEFAULT_USER_ID
+        try:
+            limit = int(payload.get("limit", 5))
+        except (TypeError, ValueError):
+            raise HTTPError(400, "limit must be an integer")
+
+        with self.memories.session(user_id) as memory:
+            results = memory.search_memory(query, limit=limit,
+                                           include_archive=bool(payload.get("include_archive", False)))
+
+        return {"user_id": user_id, "count": len(results), "results": results}
+
+    def handle_stats(self, query: Dict) -> Dict:
+        """GET /stats"""
+        user_id = query.get("user_id") or DEFAULT_USER_ID
+
+        with self.memories.session(user_id) as memory:
+            growth = memory.analyze_memories_for_soul()
+            mem_stats = memory.get_stats()
+
+        return {
+            "user_id": user_id,
+            "memory": mem_stats,
+            "conversations": growth["conversations"],
+            "facts": growth["facts"],
+            "tasks": growth["tasks"],
+            "knowledge_areas": growth["knowledge_areas"],
+            "server": self.server_stats(),
+            "stores": self.memories.get_stats(),
+            "llm": get_client().get_stats(),
+            "perf": get_client().perf.summary(),
+        }
+
+    def server_stats(self) -> Dict:
+        """Queue and worker statistics"""
+        return {
+            **self.counters,
+            "busy": self.busy,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "queue_size": self.queue_size,
+            "concurrency": self.concurrency,
+            "uptime": round(time.time() - self.started_at, 1),
+        }
+
+    # Queue and workers
+
+    async def _worker(self):
+        """Take jobs off the queue and run them on the thread pool"""
+        loop = asyncio.get_running_loop()
+        while True:
+            handler, payload, future = await self.queue.get()
+            self.busy += 1
+            try:
+                result = await loop.run_in_executor(self.executor, handler, payload)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.busy -= 1
+                self.queue.task_done()
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Dict]:
+        """Route a request and produce (status, JSON payload)"""
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+
+        if path == "/health":
+            return 200, {"status": "ok"}
+
+        if path == "/stats":
+            if method != "GET":
+                raise HTTPError(405, "Use GET for /stats")
+            # Opens the user's store, so it waits its turn like any other request
+            return 200, await self._enqueue(self.handle_stats, dict(parse_qsl(url.query)))
+
+        handler = self.routes.get(path)
+        if handler is None:
+            raise HTTPError(404, f"Unknown endpoint {path}")
+        if method != "POST":
+            raise HTTPError(405, f"Use POST for {path}")
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Request body must be JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+
+        return 200, await self._enqueue(handler, payload)
+
+    async def _enqueue(self, handler: Callable[[Dict], Dict], payload: Dict) -> Dict:
+        """Queue a job for the workers and wait for its result (429 when the queue is full)"""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((handler, payload, future))
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            raise HTTPError(429, "Server busy, retry later")
+
+        return await future
+
+    # HTTP plumbing
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict, bytes]]:
+        """Read one request; None when the client closed the connection"""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "Request headers too large")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > SERVER_MAX_BODY:
+            raise HTTPError(413, f"Body larger than {SERVER_MAX_BODY} bytes")
+        body = await reader.readexactly(length) if length else b""
+
+        return method.upper(), target, version, headers, body
+
+    async def _write_response(self, writer: asyncio.StreamWriter, status: int,
+                              payload: Dict, keep_alive: bool):
+        """Send a JSON response"""
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 429:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until it closes"""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    await self._write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, target, version, headers, body = request
+                keep_alive = (version == "HTTP/1.1"
+                              and headers.get("connection", "").lower() != "close")
+
+                self.counters["requests"] += 1
+                try:
+                    status, payload = await self._dispatch(method, target, body)
+                    self.counters["completed"] += 1
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    self.counters["errors"] += 1
+                    status, payload = 500, {"error": str(e)}
+
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    # Lifecycle
+
+    async def start(self):
+        """Start workers and begin listening"""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Pick up the real port when started with port 0
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Stop listening, cancel workers and flush open memory stores"""
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.executor.shutdown(wait=True)
+        self.memories.flush_all()
+
+    async def serve_forever(self):
+        """Run until cancelled"""
+        await self.start()
+        print(f"[SERVER] Listening on http://{self.host}:{self.port}")
+        print(f"[SERVER] Model: {self.model} | workers: {self.concurrency} | queue: {self.queue_size}")
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def _require(payload: Dict, field: str) -> str:
+    """Fetch a required non-empty string field"""
+    value = payload.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(400, f"'{field}' is required")
+    return value
+
+
+def main():
+    """Run the agent as an HTTP server"""
+    parser = argparse.ArgumentParser(description="Serve the agent over HTTP")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--concurrency", type=int, default=SERVER_CONCURRENCY,
+                        help="Requests processed at once (match OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--queue-size", type=int, default=SERVER_QUEUE_SIZE,
+                        help="Waiting requests before answering 429")
+    parser.add_argument("--model", default=OLLAMA_MODEL)
+    args = parser.parse_args()
+
+    server = AgentServer(args.host, args.port, args.concurrency, args.queue_size, args.model)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\n[SERVER] Stopped")
+
+
+if __name__ == "__main__":
+    main()
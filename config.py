@@ -10,7 +10,76 @@ MEMORY_DIR = BASE_DIR / "memory_store"
 # Ollama Configuration
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2:1b")  # Main text model for conversations
 VISION_MODEL = os.getenv("VISION_MODEL", "moondream")    # Vision model (requires more resources - may not work on limited hardware)
-OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", os.getenv("OLLAMA_HOST", "http://localhost:11434"))
+# Comma-separated list of Ollama servers to balance across (defaults to OLLAMA_BASE_URL)
+OLLAMA_ENDPOINTS = [url.strip() for url in os.getenv("OLLAMA_ENDPOINTS", OLLAMA_BASE_URL).split(",") if url.strip()]
+OLLAMA_HEALTH_CHECK_INTERVAL = 15  # Seconds between endpoint health / loaded-model checks
+OLLAMA_REQUEST_RETRIES = 2         # Other endpoints to try when one fails
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))  # Requests the server runs at once
+
+# LLM Call Deadlines and Hedging
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))  # Seconds before a call is abandoned
+LLM_HEDGE_ENABLED = False    # Send a duplicate to a second endpoint when a call runs slow
+LLM_HEDGE_PERCENTILE = 0.95  # ...slower than this percentile of recent latencies
+LLM_HEDGE_MIN_SAMPLES = 20   # Latency samples needed before hedging kicks in
+
+# Generation Profiles (Ollama options applied per call type)
+# Keep num_ctx equal for call types sharing a model - a different value makes Ollama reload it
+GENERATION_PROFILES = {
+    "chat": {"num_predict": 512, "num_ctx": 4096, "temperature": 0.7},
+    "network_reply": {"num_predict": 100, "num_ctx": 4096, "temperature": 0.8, "stop": ["\n\n"]},  # ~280 chars
+    "summarize": {"num_predict": 300, "num_ctx": 4096, "temperature": 0.3},
+    "vision": {"num_predict": 300, "num_ctx": 2048, "temperature": 0.2},
+    "triage": {"num_predict": 4, "num_ctx": 4096, "temperature": 0.0},  # One-word router decisions
+}
+NETWORK_REPLY_MAX_CHARS = 280  # AgentNet replies stop streaming once they reach this length
+
+# Model Routing (small model for triage and quick turns, larger one for substantive answers)
+ROUTER_ENABLED = False
+SMALL_MODEL = os.getenv("SMALL_MODEL", OLLAMA_MODEL)
+LARGE_MODEL = os.getenv("LARGE_MODEL", "")     # Empty = the agent's own model
+ROUTER_SMALL_CALL_TYPES = {"triage", "summarize"}
+ROUTER_SHORT_PROMPT_CHARS = 80    # Shorter chat messages go to the small model
+ROUTER_LONG_PROMPT_CHARS = 400    # Longer ones go to the large model
+ROUTER_MANY_MEMORIES = 6          # Retrieved memories that make a question substantive
+ROUTER_CLASSIFIER_ENABLED = False  # Let the small model classify in-between messages
+ROUTER_LOG_PATH = MEMORY_DIR / "router_log.jsonl"
+
+# Performance Metrics (Ollama server-side timings per call)
+PERF_SAMPLES = 500         # Calls kept in the rolling window
+PERF_COLD_LOAD_MS = 500    # load_duration above this counts as a cold model load
+PERF_DUMP_PATH = MEMORY_DIR / "perf.json"
+PERF_TRACE_PATH = os.getenv("PERF_TRACE_PATH", "")  # JSON-lines trace of every phase span, empty = off
+
+# Prometheus Metrics (networked_agent.py)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # Serve /metrics on this port, 0 = off
+
+# AgentNet Timeline (networked_agent.py)
+TIMELINE_MAX_POSTS = 500    # Most recent posts kept in RAM; older ones are evicted
+TIMELINE_SPILL_PATH = os.getenv("TIMELINE_SPILL_PATH", "")  # JSON-lines file for evicted posts, empty = drop them
+
+# Daemon Mode (python networked_agent.py --daemon)
+DAEMON_STATUS_INTERVAL = 300      # Seconds between status lines
+DAEMON_RECONNECT_MIN = 2          # First reconnect delay in seconds, doubled per failure
+DAEMON_RECONNECT_MAX = 120
+
+# Network Memory Writer (AgentNet facts are batched and written off the event loop)
+MEMORY_WRITER_BATCH = 20          # Facts per write
+MEMORY_WRITER_INTERVAL = 2.0      # Seconds a fact may wait for its batch to fill
+MEMORY_WRITER_MAX_PENDING = 500   # Buffered facts; new ones are dropped beyond this
+
+# AgentNet Reply Scheduler (mentions, then DMs, then random engagement; local chat always first)
+REPLY_MAX_CONCURRENCY = 1   # Replies generated at once
+REPLY_RATE_PER_MINUTE = 6   # Token bucket refill rate
+REPLY_BURST = 3             # Replies allowed back to back before the rate applies
+REPLY_QUEUE_MAX = 50        # Waiting replies; the lowest-priority one is dropped beyond this
+REPLY_STALE_AFTER = {       # Seconds a reply may wait before it's dropped as stale
+    "mention": 600,
+    "dm": 900,
+    "random": 120,
+}
+REPLY_TO_DMS = False        # Answer DMs on their own (off: DMs are only shown)
 
 # Memory Configuration
 MEMORY_CONFIG = {
@@ -23,14 +92,72 @@ MEMORY_CONFIG = {
     }
 }
 
+# Multi-tenant Memory Settings
+DEFAULT_USER_ID = "default_user"  # Stored directly in MEMORY_DIR (original layout)
+MEMORY_MAX_OPEN_STORES = 64       # Per-user stores kept in RAM by MemoryManager
+
 # Soul Evolution Settings
 SOUL_UPDATE_FREQUENCY = 5  # Update soul.md every N interactions
 PERSONALITY_TRAITS_MAX = 10
 KNOWLEDGE_AREAS_MAX = 20
 
+# Conversation History Settings
+HISTORY_WINDOW = 10               # Recent messages sent verbatim with each prompt
+HISTORY_SUMMARY_ENABLED = True    # Condense older turns into a rolling summary
+HISTORY_SUMMARY_BATCH = 6         # Summarize once this many messages fall out of the window
+HISTORY_SUMMARY_MAX_CHARS = 1500  # Hard cap on the rolling summary length
+HISTORY_SUMMARY_MAX_PENDING = 32  # Unsummarized messages kept while summaries fail; oldest dropped beyond this
+
 # Compaction Settings
 AUTO_COMPACT_ENABLED = True
 COMPACTION_THRESHOLD = 1000  # Compact when hot storage exceeds this
 COMPACTION_KEEP_HOT = 800     # Keep this many recent conversations in hot storage
 COMPACTION_KEEP_TASKS = 100   # Keep this many recent tasks in hot storage
 SEARCH_ARCHIVE_DEFAULT = False  # Include archive in searches by default
+
+# Near-Duplicate Suppression (SimHash fingerprints + LSH index, checked when a memory is added)
+NEAR_DUP_ENABLED = True
+NEAR_DUP_MAX_DISTANCE = 3     # Differing bits (of 64) that still count as the same memory
+NEAR_DUP_TYPES = {"fact"}     # Memory types checked ("task" works too; conversations are always stored)
+NEAR_DUP_ACTION = "merge"     # "merge": bump seen_count/last_seen on the existing memory, "skip": drop the new one
+
+# HTTP Server Settings (agent_server.py)
+SERVER_HOST = os.getenv("AGENT_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("AGENT_SERVER_PORT", "8080"))
+SERVER_CONCURRENCY = OLLAMA_NUM_PARALLEL  # Requests processed at once
+SERVER_QUEUE_SIZE = 32                    # Waiting requests before answering 429
+SERVER_MAX_BODY = 1024 * 1024             # Largest accepted request body in bytes
+
+# LLM Response Cache (opt-in per call type, for repeatable calls)
+LLM_CACHE_DIR = MEMORY_DIR / "llm_cache"
+LLM_CACHE_MAX_ENTRIES = 1000        # Least recently used entries are evicted beyond this
+LLM_CACHE_TTL = 7 * 24 * 3600       # Seconds before an entry expires
+LLM_CACHE_CALL_TYPES = {
+    "chat": False,       # Useful for eval replays / regression runs with save_to_memory=False
+    "network_reply": False,
+    "triage": False,
+    "vision": False,     # Keyed on the prepared image bytes, but VISION_CACHE below already caches descriptions
+    "summarize": False,  # Rolling conversation summaries
+}
+
+# Vision Cache (descriptions keyed by image content hash + vision model + prompt)
+VISION_CACHE_ENABLED = True
+VISION_CACHE_DIR = MEMORY_DIR / "vision_cache"
+VISION_CACHE_MAX_ENTRIES = 500      # Least recently used descriptions are evicted beyond this
+VISION_CACHE_TTL = 30 * 24 * 3600   # Seconds before a description expires
+
+# Image Preprocessing (downscale + re-encode before vision inference; needs Pillow)
+VISION_PREPROCESS_ENABLED = True
+VISION_INPUT_SIDE = {               # Native input resolution (longest side) per vision model
+    "moondream": 378,
+    "llava": 672,
+    "llama3.2-vision": 1120,
+}
+VISION_DEFAULT_SIDE = 768           # For models not listed above
+VISION_JPEG_QUALITY = 85
+VISION_PREPROCESS_CACHE_DIR = MEMORY_DIR / "image_cache"
+VISION_PREPROCESS_CACHE_MAX = 200   # Oldest preprocessed images are deleted beyond this
+VISION_CONCURRENCY = 2              # Images analyzed at once by /images (vision models are heavy)
+VISION_MAX_IMAGES = 16              # Most files one /images command will analyze
+VISION_PREFILL_ENABLED = False      # Warm the text model's prompt cache during the vision call (needs RAM for both models)
+VISION_SHOW_TIMINGS = False         # Print how long vision and prompt preparation took after each image chat
@@ -0,0 +1,140 @@
+"""Image preprocessing before vision inference
+
+Decodes the image, applies its EXIF orientation, shrinks it to the vision
+model's native input size and re-encodes it as a metadata-free JPEG, so phone
+photos aren't uploaded and encoded at full resolution. Results are cached on
+disk by content hash. Pillow is optional: without it the original bytes are
+sent unchanged.
+"""
+import hashlib
+import io
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from perf import record_span
+from config import (VISION_PREPROCESS_ENABLED, VISION_INPUT_SIDE, VISION_DEFAULT_SIDE, VISION_JPEG_QUALITY,
+                    VISION_PREPROCESS_CACHE_DIR, VISION_PREPROCESS_CACHE_MAX)
+
+_warned_no_pillow = False
+
+
+def _pillow():
+    """Import Pillow on first use (None when it isn't installed)"""
+    global _warned_no_pillow
+    try:
+        from PIL import Image, ImageOps  # Deferred: only image commands need it
+        return Image, ImageOps
+    except ImportError:
+        if not _warned_no_pillow:
+            _warned_no_pillow = True
+            print("[IMAGE] Pillow not installed - sending images at full size (pip install pillow)")
+        return None
+
+
+def file_digest(path) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def input_side(model: str) -> int:
+    """Longest side the vision model works at"""
+    return VISION_INPUT_SIDE.get(model.split(":")[0], VISION_DEFAULT_SIDE)
+
+
+def _prune(cache_dir: Path, keep: int):
+    """Delete the least recently used cached images beyond `keep` (hits refresh the mtime)"""
+    try:
+        files = sorted(cache_dir.glob("*.jpg"), key=lambda p: p.stat().st_mtime)
+    except OSError:
+        return
+    for path in files[:max(0, len(files) - keep)]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def prepare_image(path, model: str, digest: Optional[str] = None,
+                  cache_dir: Optional[Path] = VISION_PREPROCESS_CACHE_DIR,
+                  quality: int = VISION_JPEG_QUALITY) -> Dict:
+    """Bytes to send to the vision model, plus sizes and per-stage timings in ms
+
+    Returns {"data", "digest", "original_bytes", "bytes", "original_size",
+    "size", "cached", "timings"}. Sizes are None when the image wasn't decoded.
+    """
+    path = Path(path)
+    side = input_side(model)
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    digest = digest or file_digest(path)
+    result = {"digest": digest, "original_bytes": path.stat().st_size, "original_size": None,
+              "size": None, "cached": False, "timings": timings}
+
+    def stage(name: str, since: float) -> float:
+        now = time.perf_counter()
+        timings[name] = round((now - since) * 1000, 1)
+        record_span(f"image.{name}", now - since)
+        return now
+
+    cache_path = Path(cache_dir) / f"{digest[:32]}-{side}-q{quality}.jpg" if cache_dir else None
+    if cache_path and cache_path.exists():
+        result.update(data=cache_path.read_bytes(), cached=True)
+        try:
+            cache_path.touch()  # Mark as recently used so pruning keeps it
+        except OSError:
+            pass
+        stage("read", started)
+        result["bytes"] = len(result["data"])
+        return result
+
+    raw = path.read_bytes()
+    now = stage("read", started)
+    pillow = _pillow() if VISION_PREPROCESS_ENABLED else None
+    if pillow is None:
+        result.update(data=raw, bytes=len(raw))
+        return result
+
+    Image, ImageOps = pillow
+    try:
+        image = Image.open(io.BytesIO(raw))
+        result["original_size"] = image.size
+        image.draft("RGB", (side, side))  # JPEG: decode at reduced scale directly
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+            # JPEG has no alpha: put transparent areas on white rather than black
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        now = stage("decode", now)
+
+        image.thumbnail((side, side), Image.LANCZOS)
+        result["size"] = image.size
+        now = stage("resize", now)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)  # No EXIF/ICC carried over
+        data = buffer.getvalue()
+        stage("encode", now)
+    except Exception as e:
+        print(f"[IMAGE] Could not preprocess {path.name} ({e}) - sending original")
+        result.update(data=raw, bytes=len(raw))
+        return result
+
+    result.update(data=data, bytes=len(data))
+    if cache_path:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(cache_path)
+            _prune(cache_path.parent, VISION_PREPROCESS_CACHE_MAX)
+        except OSError:
+            pass  # A cache write failure shouldn't fail the call
+    return result
@@ -0,0 +1,682 @@
+"""LLM client layer in front of Ollama
+
+All model calls go through LLMClient so cross-cutting behaviour lives in one
+place. Concurrent requests with the same model, options and messages are
+coalesced ("singleflight"): the first caller runs the generation and the
+others wait for it and receive the same result. Call types enabled in
+LLM_CACHE_CALL_TYPES are also answered from a persistent response cache.
+
+Requests are balanced over OLLAMA_ENDPOINTS: least outstanding requests
+first, preferring servers that already have the model loaded, with
+background health checks and automatic retry on another server.
+
+Every call has a deadline (LLM_TIMEOUT) and can be cancelled with a
+CancelToken or Ctrl-C. With LLM_HEDGE_ENABLED, a call that runs slower than
+the model's recent p95 latency is duplicated on a second server; the first
+reply wins and the other is aborted. Aborting shuts down the attempt's
+connection, so Ollama frees the slot even before the first chunk arrives.
+"""
+import copy
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from perf import PerfStore, record_span
+from config import (LLM_CACHE_DIR, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL, LLM_CACHE_CALL_TYPES,
+                    OLLAMA_ENDPOINTS, OLLAMA_HEALTH_CHECK_INTERVAL, OLLAMA_REQUEST_RETRIES,
+                    LLM_TIMEOUT, LLM_HEDGE_ENABLED, LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_SAMPLES,
+                    GENERATION_PROFILES)
+
+# How many outstanding requests a cold model load is worth when picking an endpoint
+MODEL_AFFINITY_WEIGHT = 2
+# Latency samples kept per model for the hedging percentile
+LATENCY_SAMPLES = 200
+
+# The _Abort of the attempt running on this thread, so its connections can be tracked
+_attempt_abort = threading.local()
+
+
+class LLMTimeout(TimeoutError):
+    """An LLM call ran past its deadline"""
+
+
+class LLMCancelled(Exception):
+    """An LLM call was cancelled before it finished"""
+
+
+class _AttemptFailed(Exception):
+    """A single endpoint attempt failed (wraps the error and whether to fail over)"""
+
+    def __init__(self, error: Exception, retryable: bool):
+        super().__init__(str(error))
+        self.error = error
+        self.retryable = retryable
+
+
+class CancelToken:
+    """Cooperative cancellation flag a caller can hand to LLMClient.chat"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Abort any call holding this token"""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class _Abort:
+    """Abort flag shared by one call's attempts; setting it also cuts their connections"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._sockets: List[socket.socket] = []
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    def set(self):
+        """Abort, shutting down sockets still waiting on the server"""
+        with self._lock:
+            self._event.set()
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            _shutdown(sock)
+
+    def track(self, sock: socket.socket):
+        """Remember a socket opened by an attempt (shut it at once if already aborted)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._sockets.append(sock)
+                return
+        _shutdown(sock)
+
+
+class ResponseCache:
+    """On-disk JSON cache (one file per key) with LRU eviction and a TTL"""
+
+    def __init__(self, cache_dir: Path, max_entries: int, ttl: float):
+        """Initialize the cache (the directory is scanned lazily on first use)"""
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._index: Optional["OrderedDict[str, float]"] = None  # key -> last used
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> "OrderedDict[str, float]":
+        """Index existing entries, least recently used first"""
+        if self._index is None:
+            entries = []
+            if self.cache_dir.exists():
+                for path in self.cache_dir.glob("*.json"):
+                    try:
+                        entries.append((path.stat().st_mtime, path.stem))
+                    except OSError:
+                        continue
+            self._index = OrderedDict((key, mtime) for mtime, key in sorted(entries))
+        return self._index
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached value, or None on a miss or expired entry"""
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                self.misses += 1
+                return None
+
+            path = self._path(key)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = None
+
+            if entry is None or time.time() - entry.get("created", 0) > self.ttl:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            # Touch so recency survives restarts
+            now = time.time()
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+            index[key] = now
+            index.move_to_end(key)
+            self.hits += 1
+            return entry["value"]
+
+    def put(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entries if over the limit"""
+        with self._lock:
+            index = self._load_index()
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            path = self._path(key)
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"created": time.time(), "value": value}, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+
+            index[key] = time.time()
+            index.move_to_end(key)
+            while len(index) > self.max_entries:
+                self._remove(next(iter(index)))
+
+    def _remove(self, key: str):
+        """Drop an entry (caller holds the lock)"""
+        self._index.pop(key, None)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            for key in list(self._load_index()):
+                self._remove(key)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Cache statistics"""
+        with self._lock:
+            return {"entries": len(self._index or {}), "hits": self.hits, "misses": self.misses}
+
+
+class Endpoint:
+    """One Ollama server and what we know about it"""
+
+    def __init__(self, url: str):
+        """Initialize the endpoint (the HTTP client is created on first use)"""
+        self.url = url
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.loaded_models: set = set()              # Models resident in memory (from /api/ps)
+        self.available_models: Optional[set] = None  # Models pulled (from /api/tags), None = unknown
+        self._client = None
+
+    @property
+    def client(self) -> "ollama.Client":
+        if self._client is None:
+            import ollama  # Deferred: pulls in httpx and pydantic, most of startup time
+            self._client = ollama.Client(host=self.url, timeout=LLM_TIMEOUT, transport=_abortable_transport())
+        return self._client
+
+    def has_model(self, model: str) -> bool:
+        """False only when we know the server doesn't have the model"""
+        return self.available_models is None or _model_name(model) in self.available_models
+
+
+class EndpointPool:
+    """Picks an endpoint per request and tracks endpoint health"""
+
+    def __init__(self, urls: List[str], health_interval: float = OLLAMA_HEALTH_CHECK_INTERVAL):
+        """Initialize the pool"""
+        if not urls:
+            raise ValueError("At least one Ollama endpoint is required")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.health_interval = health_interval
+        self._lock = threading.Lock()
+        self._health_thread: Optional[threading.Thread] = None
+        self.failovers = 0
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def acquire(self, model: str, exclude: Sequence[Endpoint] = ()) -> Optional[Endpoint]:
+        """Reserve the best endpoint for a request (release() it afterwards)"""
+        if len(self.endpoints) > 1:
+            self._start_health_checks()
+
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude and e.has_model(model)]
+            # If everything looks down, try anyway - it may have recovered
+            healthy = [e for e in candidates if e.healthy] or candidates
+            if not healthy:
+                return None
+
+            name = _model_name(model)
+            endpoint = min(healthy, key=lambda e: e.outstanding +
+                           (0 if name in e.loaded_models else MODEL_AFFINITY_WEIGHT))
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint: Endpoint, model: str, error: Optional[Exception] = None,
+                aborted: bool = False) -> bool:
+        """
+        Return an endpoint after a request.
+
+        Returns True if the error means the request should be retried on
+        another endpoint. Aborted requests (cancelled or lost a hedge) say
+        nothing about the endpoint's health.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if aborted:
+                return False
+            if error is None:
+                endpoint.healthy = True
+                endpoint.loaded_models.add(_model_name(model))
+                return False
+
+            endpoint.failures += 1
+            status = getattr(error, "status_code", None)
+            if _is_connection_error(error):
+                endpoint.healthy = False
+            elif status == 404:
+                # Model not pulled on this server
+                if endpoint.available_models is not None:
+                    endpoint.available_models.discard(_model_name(model))
+            elif status is None or status < 500:
+                return False
+
+            self.failovers += 1
+            return True
+
+    def check(self, endpoint: Endpoint):
+        """Probe an endpoint's health and which models it has"""
+        try:
+            running = _as_dict(endpoint.client.ps())
+            pulled = _as_dict(endpoint.client.list())
+        except Exception:
+            with self._lock:
+                endpoint.healthy = False
+            return
+
+        with self._lock:
+            endpoint.healthy = True
+            endpoint.loaded_models = {_model_name(m.get("model") or m.get("name") or "")
+                                      for m in running.get("models", [])}
+            endpoint.available_models = {_model_name(m.get("model") or m.get("name") or "")
+                                         for m in pulled.get("models", [])}
+
+    def check_all(self):
+        """Probe every endpoint once"""
+        for endpoint in self.endpoints:
+            self.check(endpoint)
+
+    def _start_health_checks(self):
+        """Start the background health checker (multi-endpoint pools only)"""
+        with self._lock:
+            if self._health_thread is not None:
+                return
+            self._health_thread = threading.Thread(target=self._health_loop, daemon=True)
+        self._health_thread.start()
+
+    def _health_loop(self):
+        while True:
+            self.check_all()
+            time.sleep(self.health_interval)
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Per-endpoint statistics"""
+        with self._lock:
+            return [{
+                "url": e.url,
+                "healthy": e.healthy,
+                "outstanding": e.outstanding,
+                "requests": e.requests,
+                "failures": e.failures,
+                "loaded_models": sorted(e.loaded_models),
+            } for e in self.endpoints]
+
+
+class _Flight:
+    """A generation in progress that identical callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Dict] = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMClient:
+    """Thread-safe wrapper around ollama.chat with request coalescing"""
+
+    def __init__(self, endpoints: Optional[List[str]] = None, cache: Optional[ResponseCache] = None):
+        """Initialize the client"""
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Flight] = {}
+        self._latencies: Dict[str, deque] = {}
+        self.pool = EndpointPool(endpoints or OLLAMA_ENDPOINTS)
+        self.cache = cache or ResponseCache(LLM_CACHE_DIR, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL)
+        self.perf = PerfStore()
+        self.counters = {"requests": 0, "generations": 0, "coalesced": 0, "cache_hits": 0, "errors": 0,
+                         "timeouts": 0, "cancelled": 0, "hedged": 0, "stopped_early": 0}
+
+    @staticmethod
+    def request_key(model: str, messages: List[Dict], options: Optional[Dict] = None) -> str:
+        """Hash of everything that determines the generation"""
+        normalized = [
+            {**m, "content": " ".join(str(m.get("content", "")).split())}
+            for m in messages
+        ]
+        payload = json.dumps({"model": model, "messages": normalized, "options": options or {}},
+                             sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def chat(self, model: str, messages: List[Dict], options: Optional[Dict] = None,
+             call_type: str = "chat", timeout: float = LLM_TIMEOUT,
+             cancel: Optional[CancelToken] = None,
+             stop_when: Optional[Callable[[str], bool]] = None) -> Dict:
+        """
+        Run a chat completion.
+
+        The call type's GENERATION_PROFILES entry supplies default options
+        (explicit `options` override it). Cached responses (for call types enabled in LLM_CACHE_CALL_TYPES) are
+        returned with "_cached": True; otherwise the request shares any
+        identical generation already in flight. Raises LLMTimeout after
+        `timeout` seconds and LLMCancelled if `cancel` fires or Ctrl-C is hit.
+
+        `stop_when` is called with the text generated so far; returning True
+        ends the generation early and returns that text (done_reason
+        "stop_when").
+        """
+        deadline = time.monotonic() + timeout
+        options = {**GENERATION_PROFILES.get(call_type, {}), **(options or {})} or None
+        key = self.request_key(model, messages, options)
+        if stop_when is not None:
+            # Different predicates produce different results
+            key += f":{getattr(stop_when, '__module__', '')}.{getattr(stop_when, '__qualname__', '')}"
+        use_cache = LLM_CACHE_CALL_TYPES.get(call_type, False)
+
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                with self._lock:
+                    self.counters["requests"] += 1
+                    self.counters["cache_hits"] += 1
+                return {**cached, "_cached": True}
+
+        with self._lock:
+            self.counters["requests"] += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self.counters["generations"] += 1
+            else:
+                self.counters["coalesced"] += 1
+
+        if not leader:
+            self._wait_for(flight, model, deadline, cancel)
+            if isinstance(flight.error, LLMCancelled):
+                # The leader gave up, not us - run the generation ourselves
+                return self.chat(model, messages, options, call_type,
+                                 max(0.0, deadline - time.monotonic()), cancel, stop_when)
+            if flight.error is not None:
+                raise flight.error
+            # Each caller gets its own copy so nobody mutates a shared response
+            return copy.deepcopy(flight.result)
+
+        try:
+            started = time.monotonic()
+            flight.result = self._send(model, messages, options, deadline, cancel, stop_when)
+            elapsed = time.monotonic() - started
+            self.perf.record(model, call_type, flight.result, elapsed)
+            record_span(f"llm.{call_type}", elapsed)
+            if use_cache:
+                try:
+                    self.cache.put(key, flight.result)
+                except OSError:
+                    pass  # A cache write failure shouldn't fail the call
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.counters["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+        return copy.deepcopy(flight.result)
+
+    def _wait_for(self, flight: _Flight, model: str, deadline: float, cancel: Optional[CancelToken]):
+        """Wait for another caller's generation within our own deadline"""
+        try:
+            while not flight.done.wait(0.1):
+                self._check_deadline(model, deadline, cancel)
+        except KeyboardInterrupt:
+            self._count("cancelled")
+            raise LLMCancelled("LLM call interrupted") from None
+
+    def _check_deadline(self, model: str, deadline: float, cancel: Optional[CancelToken]):
+        """Raise if the call was cancelled or has run out of time"""
+        if cancel is not None and cancel.cancelled:
+            self._count("cancelled")
+            raise LLMCancelled("LLM call cancelled")
+        if time.monotonic() >= deadline:
+            self._count("timeouts")
+            raise LLMTimeout(f"No response from '{model}' before the deadline")
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _send(self, model: str, messages: List[Dict], options: Optional[Dict],
+              deadline: float, cancel: Optional[CancelToken] = None,
+              stop_when: Optional[Callable[[str], bool]] = None) -> Dict:
+        """Run one generation on the best endpoint, failing over and hedging to others"""
+        abort = _Abort()
+        tried: List[Endpoint] = []
+        running: List[Future] = []
+        last_error: Optional[Exception] = None
+        max_attempts = min(1 + OLLAMA_REQUEST_RETRIES, len(self.pool))
+        hedge_at = self._hedge_delay(model)
+        started = time.monotonic()
+
+        def launch() -> bool:
+            endpoint = self.pool.acquire(model, exclude=tried)
+            if endpoint is None:
+                return False
+            tried.append(endpoint)
+            running.append(_spawn(self._attempt, endpoint, model, messages, options, abort, stop_when))
+            return True
+
+        try:
+            launch()
+            while running:
+                self._check_deadline(model, deadline, cancel)
+                now = time.monotonic()
+                if hedge_at is not None and now - started >= hedge_at:
+                    hedge_at = None
+                    if len(tried) < len(self.pool) and launch():
+                        self._count("hedged")
+
+                done, _ = wait(running, timeout=max(0.0, min(0.1, deadline - now)),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.remove(future)
+                    try:
+                        return future.result()
+                    except _AttemptFailed as e:
+                        last_error = e.error
+                        if not e.retryable:
+                            raise e.error from None
+                        if len(tried) < max_attempts:
+                            launch()
+        except KeyboardInterrupt:
+            self._count("cancelled")
+            raise LLMCancelled("LLM call interrupted") from None
+        finally:
+            # Stop whatever is still streaming (losing hedges, abandoned calls)
+            abort.set()
+
+        raise last_error or RuntimeError(f"No Ollama endpoint has model '{model}'")
+
+    def _attempt(self, endpoint: Endpoint, model: str, messages: List[Dict],
+                 options: Optional[Dict], abort: _Abort,
+                 stop_when: Optional[Callable[[str], bool]] = None) -> Dict:
+        """Stream a generation from one endpoint, stopping early when aborted or stop_when says so"""
+        kwargs = {"options": options} if options else {}
+        started = time.monotonic()
+        content: List[str] = []
+        final: Dict = {}
+
+        _attempt_abort.current = abort  # Connections opened from here on can be cut by abort.set()
+        try:
+            stream = endpoint.client.chat(model=model, messages=messages, stream=True, **kwargs)
+            try:
+                for chunk in stream:
+                    if abort.is_set():
+                        break
+                    final = _as_dict(chunk)
+                    content.append((final.get("message") or {}).get("content") or "")
+                    if stop_when is not None and not final.get("done") and stop_when("".join(content)):
+                        # Closing the stream makes Ollama stop decoding
+                        final["done"] = True
+                        final["done_reason"] = "stop_when"
+                        self._count("stopped_early")
+                        break
+            finally:
+                stream.close()
+        except Exception as e:
+            if abort.is_set():
+                self.pool.release(endpoint, model, aborted=True)
+                raise LLMCancelled("Attempt aborted") from e
+            raise _AttemptFailed(e, self.pool.release(endpoint, model, error=e)) from e
+        finally:
+            _attempt_abort.current = None
+
+        if abort.is_set():
+            self.pool.release(endpoint, model, aborted=True)
+            raise LLMCancelled("Attempt aborted")
+
+        self.pool.release(endpoint, model)
+        with self._lock:
+            samples = self._latencies.setdefault(_model_name(model), deque(maxlen=LATENCY_SAMPLES))
+            samples.append(time.monotonic() - started)
+
+        final["message"] = {**(final.get("message") or {}), "content": "".join(content)}
+        return final
+
+    def _hedge_delay(self, model: str) -> Optional[float]:
+        """Seconds after which a duplicate request is sent, or None to not hedge"""
+        if not LLM_HEDGE_ENABLED or len(self.pool) < 2:
+            return None
+        with self._lock:
+            samples = sorted(self._latencies.get(_model_name(model), ()))
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * LLM_HEDGE_PERCENTILE))]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats["inflight"] = len(self._inflight)
+        stats["coalesced_ratio"] = round(stats["coalesced"] / stats["requests"], 3) if stats["requests"] else 0.0
+        stats["cache"] = self.cache.get_stats()
+        stats["failovers"] = self.pool.failovers
+        stats["endpoints"] = self.pool.get_stats()
+        return stats
+
+
+def _as_dict(response: Any) -> Dict:
+    """Normalize an ollama response (dict or pydantic model) to a plain dict"""
+    if isinstance(response, dict):
+        return response
+    if hasattr(response, "model_dump"):
+        return response.model_dump()
+    return dict(response)
+
+
+def _model_name(name: str) -> str:
+    """Normalize a model name so 'moondream' matches 'moondream:latest'"""
+    return name if ":" in name else f"{name}:latest"
+
+
+def _spawn(fn, *args) -> Future:
+    """Run fn on a daemon thread (a hung server can't block interpreter exit)"""
+    future: Future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _shutdown(sock: socket.socket):
+    """Shut a socket down in both directions; wakes a thread blocked reading it"""
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass  # Already closed
+
+
+def _abortable_transport() -> "httpx.BaseTransport":
+    """HTTP transport that registers each new connection with the current attempt's _Abort"""
+    import httpx
+
+    class AbortableTransport(httpx.BaseTransport):
+        def __init__(self):
+            # No keep-alive, so every attempt opens its own connection on its own thread
+            # and we know which socket to shut down (a localhost connect costs far less than a generation)
+            self._transport = httpx.HTTPTransport(limits=httpx.Limits(max_keepalive_connections=0))
+
+        def handle_request(self, request: "httpx.Request") -> "httpx.Response":
+            abort = getattr(_attempt_abort, "current", None)
+            if abort is not None:
+                outer = request.extensions.get("trace")
+
+                def trace(event: str, info: Dict):
+                    # httpcore's trace extension hands us the stream once the connection is up
+                    if event in ("connection.connect_tcp.complete", "connection.connect_unix_socket.complete"):
+                        sock = info["return_value"].get_extra_info("socket")
+                        if sock is not None:
+                            abort.track(sock)
+                    if outer is not None:
+                        outer(event, info)
+
+                request.extensions = {**request.extensions, "trace": trace}
+            return self._transport.handle_request(request)
+
+        def close(self):
+            self._transport.close()
+
+    return AbortableTransport()
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """True for network-level failures (server down, refused, timed out)"""
+    return (isinstance(error, (ConnectionError, TimeoutError, OSError))
+            or type(error).__module__.startswith("httpx"))
+
+
+_default_client: Optional[LLMClient] = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> LLMClient:
+    """Process-wide client, shared so requests from every agent can coalesce"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = LLMClient()
+        return _default_client
@@ -3,7 +3,6 @@ import json
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from mem0 import Memory
 from config import MEMORY_CONFIG, SOUL_PATH, SOUL_UPDATE_FREQUENCY
 
 
@@ -12,10 +11,18 @@ class Mem0Layer:
 
     def __init__(self):
         """Initialize the memory layer"""
-        self.memory = Memory.from_config(MEMORY_CONFIG)
+        self._memory = None  # mem0 and its Chroma store are built on first use
         self.interaction_count = 0
         self.user_id = "default_user"
 
+    @property
+    def memory(self):
+        """The mem0 Memory, imported and constructed on first access"""
+        if self._memory is None:
+            from mem0 import Memory
+            self._memory = Memory.from_config(MEMORY_CONFIG)
+        return self._memory
+
     def add_conversation(self, user_message: str, agent_response: str, metadata: Optional[Dict] = None) -> str:
         """Store a conversation exchange"""
         conversation = f"User: {user_message}\nAgent: {agent_response}"
@@ -0,0 +1,116 @@
+"""Background batched writer for network-sourced memories
+
+Each SimpleMemory.add_fact rewrites the whole JSON store, which is too slow
+to do inside AgentNet event handlers. MemoryWriter buffers facts in a bounded
+queue and a background thread stores them in batches of MEMORY_WRITER_BATCH
+(or whatever arrived within MEMORY_WRITER_INTERVAL seconds) with one write.
+"""
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from simple_memory import SimpleMemory
+from config import MEMORY_WRITER_BATCH, MEMORY_WRITER_INTERVAL, MEMORY_WRITER_MAX_PENDING
+
+_STOP = object()
+
+
+class MemoryWriter:
+    """Queue facts without blocking; a daemon thread writes them in batches"""
+
+    def __init__(self, memory: SimpleMemory, batch_size: int = MEMORY_WRITER_BATCH,
+                 interval: float = MEMORY_WRITER_INTERVAL, max_pending: int = MEMORY_WRITER_MAX_PENDING):
+        """Initialize the writer (the thread starts with the first fact)"""
+        self.memory = memory
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.counters = {"queued": 0, "written": 0, "batches": 0, "dropped": 0, "errors": 0}
+
+    def add_fact(self, fact: str, category: Optional[str] = None) -> bool:
+        """Queue a fact; False if the buffer is full and it was dropped"""
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((fact, category))
+        except queue.Full:
+            self.counters["dropped"] += 1
+            return False
+        self.counters["queued"] += 1
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is written; False on timeout"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Write what's pending and stop the thread"""
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _ensure_thread(self):
+        """Start the writer thread once"""
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True, name="memory-writer")
+                    self._thread.start()
+
+    def _run(self):
+        """Collect a batch, write it, repeat"""
+        while True:
+            item = self._queue.get()
+            batch: List[Tuple[str, Optional[str]]] = []
+            markers: List[threading.Event] = []
+            stop = False
+
+            # Keep collecting until the batch is full, the interval passes or someone flushes
+            deadline = time.monotonic() + self.interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stop or markers or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self.memory.add_facts(batch)
+                    self.counters["written"] += len(batch)
+                    self.counters["batches"] += 1
+                except Exception as e:
+                    self.counters["errors"] += 1
+                    print(f"[Memory] Failed to write {len(batch)} network facts: {e}")
+            for marker in markers:
+                marker.set()
+            if stop:
+                return
+
+    @property
+    def pending(self) -> int:
+        """Facts (and flush markers) waiting to be written"""
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Writer statistics"""
+        return {**self.counters, "pending": self.pending}
@@ -0,0 +1,143 @@
+"""Prometheus metrics endpoint for long-running agents
+
+Serves the text exposition format on METRICS_PORT (off when 0). Counters are
+incremented with inc(); gauges are callables registered with
+register_gauge() and read at scrape time. Phase and LLM latency histograms
+come straight from the perf spans, so there's no second set of timers.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import perf
+from config import METRICS_HOST, METRICS_PORT
+
+# Prometheus histogram bucket bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Counters derived from span counts: metric -> (span, help)
+SPAN_COUNTERS = {
+    "agent_chats_total": ("chat.total", "Chat turns handled"),
+    "agent_compactions_total": ("memory.compact", "Memory compactions run"),
+    "agent_soul_writes_total": ("memory.soul_write", "Writes of soul.md"),
+}
+
+COUNTER_HELP = {
+    "agent_network_events_total": "AgentNet events received, by event type",
+    "agent_network_replies_total": "Replies posted to AgentNet",
+    "agent_network_skipped_total": "AgentNet posts considered but not replied to",
+}
+
+GaugeValue = Union[float, Dict[str, float]]
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+_gauges: Dict[str, Tuple[str, str, Callable[[], GaugeValue]]] = {}
+
+
+def inc(name: str, amount: float = 1, **labels: str):
+    """Increment a counter"""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def register_gauge(name: str, help_text: str, fn: Callable[[], GaugeValue], label: str = ""):
+    """Read fn() at scrape time; a dict result becomes one series per key under `label`"""
+    with _lock:
+        _gauges[name] = (help_text, label, fn)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _histogram(lines: List[str], name: str, label: str, histograms: Dict[str, perf.LatencyHistogram]):
+    """Render span histograms as one Prometheus histogram family"""
+    if not histograms:
+        return
+    lines.append(f"# TYPE {name} histogram")
+    for value, histogram in sorted(histograms.items()):
+        counts = histogram.cumulative(LATENCY_BUCKETS)
+        for bound, count in zip(LATENCY_BUCKETS, counts):
+            lines.append(f"{name}_bucket{_labels([(label, value), ('le', bound)])} {count}")
+        lines.append(f"{name}_bucket{_labels([(label, value), ('le', '+Inf')])} {histogram.count}")
+        lines.append(f"{name}_sum{_labels([(label, value)])} {histogram.total_us / 1_000_000}")
+        lines.append(f"{name}_count{_labels([(label, value)])} {histogram.count}")
+
+
+def render() -> str:
+    """Current metrics in Prometheus text format"""
+    lines: List[str] = []
+    spans = perf.get_spans()
+
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+
+    for name, (span_name, help_text) in SPAN_COUNTERS.items():
+        histogram = spans.get(span_name)
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter",
+                  f"{name} {histogram.count if histogram else 0}"]
+
+    for name in sorted({n for n, _ in counters}):
+        if name in COUNTER_HELP:
+            lines.append(f"# HELP {name} {COUNTER_HELP[name]}")
+        lines.append(f"# TYPE {name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{name}{_labels(labels)} {value}")
+
+    for name, (help_text, label, fn) in sorted(gauges.items()):
+        try:
+            value = fn()
+        except Exception:
+            continue  # A broken source shouldn't take the endpoint down
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+        if isinstance(value, dict):
+            lines += [f"{name}{_labels([(label, k)])} {v}" for k, v in sorted(value.items())]
+        else:
+            lines.append(f"{name} {value}")
+
+    _histogram(lines, "agent_llm_request_duration_seconds", "call_type",
+               {n[len("llm."):]: h for n, h in spans.items() if n.startswith("llm.")})
+    _histogram(lines, "agent_phase_duration_seconds", "phase",
+               {n: h for n, h in spans.items() if not n.startswith("llm.")})
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass  # Scrapes every few seconds would flood the console
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics on a background thread (returns None when port is 0 or can't be bound)"""
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        # Another agent (or anything else) on the port shouldn't stop this one starting
+        print(f"[METRICS] Could not listen on {host}:{port} ({e}) - metrics disabled")
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,149 @@
+"""Tiered model routing
+
+Picks a small or large model per request from cheap features: call type,
+prompt length, how many memories were retrieved and, optionally, a one-word
+classification from the small model. The small model also triages AgentNet
+posts (reply or skip) so the large one only runs for substantive answers.
+Decisions and per-tier latency are appended to ROUTER_LOG_PATH.
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from llm_client import LLMClient, get_client
+from config import (ROUTER_ENABLED, SMALL_MODEL, LARGE_MODEL, ROUTER_SMALL_CALL_TYPES,
+                    ROUTER_SHORT_PROMPT_CHARS, ROUTER_LONG_PROMPT_CHARS, ROUTER_MANY_MEMORIES,
+                    ROUTER_CLASSIFIER_ENABLED, ROUTER_LOG_PATH)
+
+MEMORIES_HEADER = "=== RELEVANT MEMORIES"
+
+
+class ModelRouter:
+    """Chooses a model tier per LLM call and keeps per-tier latency"""
+
+    def __init__(self, llm: Optional[LLMClient] = None, enabled: bool = ROUTER_ENABLED,
+                 small_model: str = SMALL_MODEL, large_model: str = LARGE_MODEL,
+                 log_path: Optional[Path] = ROUTER_LOG_PATH):
+        """Initialize the router (large_model "" means the caller's own model)"""
+        self._llm = llm
+        self.enabled = enabled
+        self.small_model = small_model
+        self.large_model = large_model
+        self.log_path = Path(log_path) if log_path else None
+        self._lock = threading.Lock()
+        self.tiers: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def llm(self) -> LLMClient:
+        return self._llm or get_client()
+
+    def route(self, call_type: str, prompt: str, messages: Optional[List[Dict]] = None,
+              default_model: str = "") -> Dict[str, Any]:
+        """Decide which model serves a call"""
+        large = self.large_model or default_model
+        decision = {"call_type": call_type, "prompt_chars": len(prompt),
+                    "memories": _memory_count(messages or [])}
+
+        if not self.enabled:
+            tier, reason = "default", "router disabled"
+        elif call_type in ROUTER_SMALL_CALL_TYPES:
+            tier, reason = "small", "call type"
+        elif call_type != "chat":
+            tier, reason = "large", "call type"
+        elif len(prompt) >= ROUTER_LONG_PROMPT_CHARS:
+            tier, reason = "large", "long prompt"
+        elif decision["memories"] >= ROUTER_MANY_MEMORIES:
+            tier, reason = "large", "many memories"
+        elif len(prompt) < ROUTER_SHORT_PROMPT_CHARS:
+            tier, reason = "small", "short prompt"
+        elif ROUTER_CLASSIFIER_ENABLED:
+            tier, reason = self._classify(prompt), "classifier"
+        else:
+            tier, reason = "large", "default"
+
+        models = {"small": self.small_model, "large": large, "default": default_model}
+        decision.update(tier=tier, reason=reason, model=models[tier])
+        return decision
+
+    def _classify(self, prompt: str) -> str:
+        """Ask the small model whether a message needs the large one"""
+        try:
+            response = self.llm.chat(
+                model=self.small_model,
+                messages=[{"role": "user", "content":
+                           "Classify this message. Reply with one word: SIMPLE (greeting, small talk, "
+                           f"quick fact) or COMPLEX (needs reasoning or explanation).\n\n{prompt}"}],
+                call_type="triage"
+            )
+        except Exception:
+            return "large"
+        return "small" if "SIMPLE" in response['message']['content'].upper() else "large"
+
+    def wants_reply(self, prompt: str) -> bool:
+        """Triage an AgentNet post on the small model: True if it deserves a reply"""
+        decision = self.route("triage", prompt)
+        started = time.perf_counter()
+        try:
+            response = self.llm.chat(
+                model=decision["model"],
+                messages=[{"role": "user", "content": f"{prompt}\nAnswer with one word: REPLY or SKIP."}],
+                call_type="triage"
+            )
+        except Exception:
+            return True  # Let the full reply path decide
+        verdict = "SKIP" not in response['message']['content'].upper()
+        self.record(decision, time.perf_counter() - started, verdict="reply" if verdict else "skip")
+        return verdict
+
+    def record(self, decision: Dict[str, Any], latency: float, **extra):
+        """Log a routing decision with the call's latency"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            tier = self.tiers.setdefault(decision["tier"], {"calls": 0, "total_latency": 0.0})
+            tier["calls"] += 1
+            tier["total_latency"] += latency
+
+            if self.log_path is None:
+                return
+            entry = {"timestamp": datetime.now().isoformat(), **decision,
+                     "latency": round(latency, 3), **extra}
+            try:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except OSError:
+                pass  # Logging must never break a reply
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Calls and average latency per tier"""
+        with self._lock:
+            return {name: {"calls": t["calls"],
+                           "avg_latency": round(t["total_latency"] / t["calls"], 3)}
+                    for name, t in self.tiers.items()}
+
+
+def _memory_count(messages: List[Dict]) -> int:
+    """Number of retrieved memories in the prompt's memory block"""
+    for message in messages:
+        content = message.get("content", "")
+        if message.get("role") == "system" and content.startswith(MEMORIES_HEADER):
+            return content.count("\n\n[")
+    return 0
+
+
+_default_router: Optional[ModelRouter] = None
+_default_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    """Process-wide router, shared so per-tier stats cover every agent"""
+    global _default_router
+    with _default_lock:
+        if _default_router is None:
+            _default_router = ModelRouter()
+        return _default_router
@@ -0,0 +1,34 @@
+"""Helpers for short AgentNet replies: spotting SKIP and keeping to the length cap"""
+import re
+
+from config import NETWORK_REPLY_MAX_CHARS
+
+# "SKIP" as the whole reply or its first word (not "Skipping breakfast...")
+SKIP_PREFIX = re.compile(r"^[\W_]*SKIP(?=[\W_])", re.IGNORECASE)
+
+
+def is_skip(text: str) -> bool:
+    """True when a finished reply means the agent chose not to respond"""
+    return bool(SKIP_PREFIX.match(text + " ")) or ("SKIP" in text.upper() and len(text) < 20)
+
+
+def reply_should_stop(text: str) -> bool:
+    """Stop a streaming reply once it's a SKIP or has used up the character budget"""
+    return bool(SKIP_PREFIX.match(text)) or len(text.strip()) >= NETWORK_REPLY_MAX_CHARS
+
+
+def trim_reply(text: str, limit: int = NETWORK_REPLY_MAX_CHARS) -> str:
+    """Cut a reply to the limit, preferring the last full sentence"""
+    text = text.strip()
+    if len(text) <= limit:
+        return text
+
+    cut = text[:limit]
+    sentence_end = max(cut.rfind(p) for p in (". ", "! ", "? ", ".\n", "!\n", "?\n"))
+    if text[limit - 1] in ".!?" and (len(text) == limit or text[limit].isspace()):
+        return cut
+    if sentence_end >= limit // 2:
+        return cut[:sentence_end + 1]
+
+    # No usable sentence boundary - cut at a word instead
+    return cut[:limit - 3].rsplit(" ", 1)[0].rstrip(",;:-") + "..."
@@ -3,18 +3,31 @@ Networked version of your personal agent with AgentNet capabilities
 Keeps all existing features: memory, soul, thinking indicator
 """
 
+import argparse
 import asyncio
+import signal
 import sys
 import socket
+import threading
+import time
 import uuid
 from pathlib import Path
+from typing import Callable, Optional
 
 # Add agentnet to path so we can import it
 sys.path.append(str(Path(__file__).parent.parent / "agentnet"))
 
 from agentnet_client import AgentNetClient
 from simple_agent import SimpleAgent
-from config import OLLAMA_MODEL
+from llm_client import CancelToken
+from timeline_store import TimelineStore
+from reply_scheduler import ReplyScheduler
+from memory_writer import MemoryWriter
+from network_reply import is_skip, reply_should_stop, trim_reply
+from perf import print_perf
+import metrics
+from config import (OLLAMA_MODEL, NETWORK_REPLY_MAX_CHARS, PERF_DUMP_PATH, METRICS_HOST, METRICS_PORT,
+                    DAEMON_STATUS_INTERVAL, DAEMON_RECONNECT_MIN, DAEMON_RECONNECT_MAX, REPLY_TO_DMS)
 
 
 class NetworkedPersonalAgent(SimpleAgent):
@@ -30,9 +43,10 @@ class NetworkedPersonalAgent(SimpleAgent):
         # Network client
         self.network_client = None
         self.network_enabled = False
+        self.listen_task = None
 
-        # Timeline
-        self.timeline = []
+        # Timeline (bounded, indexed by post id and author)
+        self.timeline = TimelineStore()
 
         # Autonomous behavior
         self.auto_respond = True
@@ -42,6 +56,13 @@ class NetworkedPersonalAgent(SimpleAgent):
         self.save_network_to_memory = True  # Save network interactions to memory
         self.save_own_posts = True  # Remember what you post
         self.save_interesting_posts = True  # Remember interesting posts from others
+        # Network facts are batched and written in the background, off the event loop
+        self.memory_writer = MemoryWriter(self.memory)
+
+        # Autonomous replies are queued by priority and rate limited
+        self.scheduler = ReplyScheduler()
+        # Replies currently being generated (exported as a queue depth)
+        self.pending_replies = 0
 
     def extract_name_from_soul(self) -> str:
         """Extract agent name from soul or generate one"""
@@ -115,7 +136,7 @@ class NetworkedPersonalAgent(SimpleAgent):
         if connected:
             self.network_enabled = True
             # Start listening
-            asyncio.create_task(self.network_client.listen())
+            self.listen_task = asyncio.create_task(self.network_client.listen())
             print(f"[Network] Connected as {self.agent_name} ({self.agent_id})")
             print(f"[Network] Soul: {soul_summary}")
 
@@ -124,15 +145,36 @@ class NetworkedPersonalAgent(SimpleAgent):
     async def disconnect_from_network(self):
         """Disconnect from AgentNet"""
         if self.network_client:
+            await self.scheduler.close()
             await self.network_client.disconnect()
             self.network_enabled = False
+        # Don't lose network facts still waiting for their batch, or evicted posts not yet spilled
+        await asyncio.to_thread(self.memory_writer.flush)
+        await asyncio.to_thread(self.timeline.flush)
+
+    def register_metrics(self):
+        """Export memory size and queue depths as Prometheus gauges"""
+        metrics.register_gauge("agent_memory_entries", "Memories stored, by tier",
+                               lambda: {k: v for k, v in self.memory.get_stats().items() if k != "total"},
+                               label="store")
+        metrics.register_gauge("agent_queue_depth", "Work waiting or in flight, by queue",
+                               lambda: {
+                                   "pending_replies": self.pending_replies,
+                                   "reply_queue": self.scheduler.queue_depth,
+                                   "memory_writes": self.memory_writer.pending,
+                                   "llm_inflight": self.llm.get_stats()["inflight"],
+                                   "llm_outstanding": sum(e["outstanding"] for e in self.llm.pool.get_stats()),
+                               }, label="queue")
+        metrics.register_gauge("agent_timeline_posts", "AgentNet posts kept in the in-memory timeline",
+                               lambda: len(self.timeline))
 
     # Event Handlers
 
     async def on_network_post(self, data: dict):
         """Handle new post from network"""
         post = data['post']
-        self.timeline.append(post)
+        self.timeline.add(post)
+        metrics.inc("agent_network_events_total", event="new_post")
 
         # Don't respond to own posts
         if post['agent_id'] == self.agent_id:
@@ -143,38 +185,69 @@ class NetworkedPersonalAgent(SimpleAgent):
         # Save interesting posts to memory
         if self.save_interesting_posts and self.should_respond_to_post(post):
             fact = f"AgentNet post from {post['agent_name']}: {post['content'][:100]}"
-            self.memory.add_fact(fact, category="network_posts")
+            self.memory_writer.add_fact(fact, category="network_posts")
 
-        # Check if should respond
-        if self.auto_respond and self.should_respond_to_post(post):
-            print(f"[Agent] Generating response...")
-            response = await self.generate_response_to_post(post)
-            if response:
-                await self.network_client.reply(post['id'], response)
-                print(f"[Agent] Replied: {response}")
+        # Queue a reply: mentions jump ahead of random engagement
+        kind = self.reply_kind(post)
+        if self.auto_respond and kind:
+            self.scheduler.submit(kind, lambda: self.reply_to_post(post))
 
-                # Update soul if needed after interaction
-                soul_updated = self.memory.update_soul_if_needed()
-                if soul_updated:
-                    print("[Soul] Updated after network interaction")
+    async def reply_to_post(self, post: dict):
+        """Generate and post a reply (run by the scheduler)"""
+        print(f"[Agent] Generating response to @{post['agent_name']}...")
+        self.pending_replies += 1
+        try:
+            response = await self.generate_response_to_post(post)
+        finally:
+            self.pending_replies -= 1
+        if not response:
+            metrics.inc("agent_network_skipped_total")
+        else:
+            await self.network_client.reply(post['id'], response)
+            metrics.inc("agent_network_replies_total")
+            print(f"[Agent] Replied: {response}")
+
+            # Update soul if needed after interaction
+            soul_updated = self.memory.update_soul_if_needed()
+            if soul_updated:
+                print("[Soul] Updated after network interaction")
 
     async def on_network_reply(self, data: dict):
         """Handle reply to a post"""
         post_id = data['post_id']
         reply = data['reply']
+        metrics.inc("agent_network_events_total", event="new_reply")
 
         # Check if it's a reply to our post
-        for post in self.timeline:
-            if post['id'] == post_id and post['agent_id'] == self.agent_id:
-                print(f"\n[Reply to you] @{reply['agent_name']}: {reply['content']}")
-                break
+        post = self.timeline.get(post_id)
+        if post and post['agent_id'] == self.agent_id:
+            print(f"\n[Reply to you] @{reply['agent_name']}: {reply['content']}")
 
     async def on_direct_message(self, data: dict):
         """Handle direct message"""
         from_name = data['from_name']
         content = data['content']
+        metrics.inc("agent_network_events_total", event="dm_received")
         print(f"\n[DM from {from_name}]: {content}")
 
+        # Answer DMs (when enabled) after mentions but before random engagement
+        if REPLY_TO_DMS and self.auto_respond and data.get('from_id'):
+            self.scheduler.submit("dm", lambda: self.reply_to_dm(data['from_id'], from_name, content))
+
+    async def reply_to_dm(self, from_id: str, from_name: str, content: str):
+        """Generate and send a DM reply (run by the scheduler)"""
+        self.pending_replies += 1
+        try:
+            response = await self.generate_response_to_dm(from_name, content)
+        finally:
+            self.pending_replies -= 1
+        if not response:
+            metrics.inc("agent_network_skipped_total")
+        else:
+            await self.network_client.dm(from_id, response)
+            metrics.inc("agent_network_replies_total")
+            print(f"[Agent] Replied to {from_name}: {response}")
+
     def on_agent_joined(self, data: dict):
         """Handle agent joining"""
         if data['agent_id'] != self.agent_id:
@@ -188,7 +261,7 @@ class NetworkedPersonalAgent(SimpleAgent):
     def on_timeline_received(self, data: dict):
         """Handle timeline response"""
         posts = data['posts']
-        self.timeline = posts
+        self.timeline.replace(posts)
 
         print(f"\n{'='*60}")
         print(f"TIMELINE ({len(posts)} posts)")
@@ -250,13 +323,17 @@ class NetworkedPersonalAgent(SimpleAgent):
 
     def should_respond_to_post(self, post: dict) -> bool:
         """Decide if should respond"""
+        return self.reply_kind(post) is not None
+
+    def reply_kind(self, post: dict):
+        """Scheduler priority for a reply: "mention", "random", or None for no reply"""
         # Respond if mentioned
         if self.agent_name.lower() in post['content'].lower():
-            return True
+            return "mention"
 
         # Random chance
         import random
-        return random.random() < self.response_chance
+        return "random" if random.random() < self.response_chance else None
 
     async def generate_response_to_post(self, post: dict):
         """Generate response using your existing agent"""
@@ -267,16 +344,27 @@ class NetworkedPersonalAgent(SimpleAgent):
 Should you respond? If yes, write a thoughtful reply.
 If not relevant to you, respond with just "SKIP".
 
-Keep responses concise (under 280 characters).
+Keep responses concise (under {NETWORK_REPLY_MAX_CHARS} characters).
 Use your memories and personality to craft an authentic response.
 """
 
+        # Let the small model decide whether the post is worth a reply at all,
+        # so the large model only runs for substantive answers
+        if self.router.enabled and not await asyncio.to_thread(self.router.wants_reply, prompt):
+            return None
+
         # Use your existing chat method with memory!
         # Save to memory if enabled so agent learns from network interactions
-        response, soul_updated, compacted = self.chat(
+        # Runs in a worker thread so the event loop keeps handling network events,
+        # and identical prompts from simultaneous posts share one generation.
+        # The reply streams and stops as soon as it's a SKIP or over budget.
+        response, soul_updated, compacted = await asyncio.to_thread(
+            self.chat,
             prompt,
             save_to_memory=self.save_network_to_memory,
-            include_context=True
+            include_context=True,
+            call_type="network_reply",
+            stop_when=reply_should_stop
         )
 
         # Show feedback if soul/memory updated
@@ -286,58 +374,122 @@ Use your memories and personality to craft an authentic response.
             print("[Memory] Compacted memories")
 
         # Check if wants to skip
-        if "SKIP" in response.upper() and len(response) < 20:
+        if is_skip(response):
             return None
 
         # Clean and limit
-        response = response.strip()
-        if len(response) > 280:
-            response = response[:277] + "..."
+        response = trim_reply(response)
 
         # If responding, save this as a fact about the interaction
         if self.save_interesting_posts:
             fact = f"Discussed '{post['content'][:50]}...' with {post['agent_name']} on AgentNet"
-            self.memory.add_fact(fact, category="network_interactions")
+            self.memory_writer.add_fact(fact, category="network_interactions")
 
         return response
 
+    async def generate_response_to_dm(self, from_name: str, content: str):
+        """Generate a private reply to a direct message"""
+        prompt = f"""{from_name} sent you a direct message on AgentNet:
 
-def main():
-    """Main CLI loop"""
-    print("="*60)
-    print("Personal Agent - AgentNet Edition")
-    print("Your agent with memory + network capabilities")
-    print("="*60)
-    print()
+"{content}"
 
-    # Create agent
-    agent = NetworkedPersonalAgent()
+This is a private conversation with {from_name}, not a public post.
+Reply to them directly, or respond with just "SKIP" if no answer is needed.
 
-    print(f"Agent: {agent.agent_name}")
-    print(f"ID: {agent.agent_id}")
-    print(f"Model: {agent.model}")
-    print(f"Memories: {len(agent.memory.get_all_facts())} facts stored")
-    print()
+Keep responses concise (under {NETWORK_REPLY_MAX_CHARS} characters).
+Use your memories and personality to craft an authentic response.
+"""
 
-    print("Commands:")
-    print("  /help - Show all commands")
-    print("  /connect [url] - Connect to AgentNet")
-    print("  /quit - Exit")
-    print()
+        # Same generation profile as post replies, off the event loop and
+        # stopping early on SKIP or the budget; no "Discussed" fact for DMs
+        response, soul_updated, compacted = await asyncio.to_thread(
+            self.chat,
+            prompt,
+            save_to_memory=self.save_network_to_memory,
+            include_context=True,
+            call_type="network_reply",
+            stop_when=reply_should_stop
+        )
+
+        if soul_updated:
+            print("[Soul] Updated based on network interaction")
+        if compacted:
+            print("[Memory] Compacted memories")
+
+        if is_skip(response):
+            return None
+        return trim_reply(response)
+
+
+class ConsoleInput:
+    """Reads console lines on a daemon thread so input() never blocks the event loop"""
+
+    def __init__(self, prompt: str = "You: "):
+        """Initialize the reader (call from the running loop)"""
+        self.prompt = prompt
+        self._loop = asyncio.get_running_loop()
+        self._lines: asyncio.Queue = asyncio.Queue()
+        self._ready = threading.Event()
+        threading.Thread(target=self._run, daemon=True, name="console-input").start()
+
+    def _run(self):
+        while True:
+            self._ready.wait()
+            self._ready.clear()
+            try:
+                line = input(self.prompt)
+            except EOFError:
+                line = None
+            self._loop.call_soon_threadsafe(self._lines.put_nowait, line)
+            if line is None:
+                return
+
+    async def readline(self) -> Optional[str]:
+        """Prompt for the next line (None at end of input)"""
+        self._ready.set()
+        return await self._lines.get()
+
+
+def _on_signals(handler: Callable[[], None], *signums: int):
+    """Run handler on the event loop when one of the signals arrives"""
+    loop = asyncio.get_running_loop()
+    for signum in signums:
+        signal.signal(signum, lambda *_: loop.call_soon_threadsafe(handler))
+
+
+async def shutdown(agent: "NetworkedPersonalAgent"):
+    """Disconnect and write out anything still pending"""
+    if agent.network_enabled:
+        await agent.disconnect_from_network()
+    await asyncio.to_thread(agent.memory_writer.close)
+
+
+async def run_cli(agent: "NetworkedPersonalAgent"):
+    """Interactive loop on one persistent event loop, so the network listener keeps running"""
+    console = ConsoleInput()
+    chat_cancel: Optional[CancelToken] = None
+
+    def on_interrupt():
+        # Ctrl-C stops the reply being generated, otherwise it's a reminder
+        if chat_cancel is not None:
+            chat_cancel.cancel()
+        else:
+            print("\n\nUse /quit to exit")
+
+    _on_signals(on_interrupt, signal.SIGINT)
 
-    # Main loop
     while True:
         try:
-            user_input = input("You: ").strip()
+            user_input = await console.readline()
+            if user_input is None:
+                break
+            user_input = user_input.strip()
 
             if not user_input:
                 continue
 
             # Network commands
             if user_input.lower() == "/quit":
-                if agent.network_enabled:
-                    asyncio.run(agent.disconnect_from_network())
-                print("Goodbye!")
                 break
 
             elif user_input.lower() == "/help":
@@ -346,30 +498,32 @@ def main():
             elif user_input.lower().startswith("/connect"):
                 parts = user_input.split()
                 server = parts[1] if len(parts) > 1 else "ws://localhost:8765"
-                success = asyncio.run(agent.connect_to_network(server))
+                success = await agent.connect_to_network(server)
                 if not success:
                     print(f"Failed to connect to {server}")
 
             elif user_input.lower() == "/disconnect":
-                asyncio.run(agent.disconnect_from_network())
+                await agent.disconnect_from_network()
 
             elif user_input.lower().startswith("/post "):
                 if agent.network_enabled:
                     content = user_input[6:]
-                    asyncio.run(agent.network_client.post(content))
+                    await agent.network_client.post(content)
                     print("[Posted]")
 
-                    # Save own posts to memory
+                    # Save own posts to memory (written in the background)
                     if agent.save_own_posts:
                         fact = f"Posted to AgentNet: {content}"
-                        agent.memory.add_fact(fact, category="my_network_posts")
-                        print("[Saved to memory]")
+                        if agent.memory_writer.add_fact(fact, category="my_network_posts"):
+                            print("[Saved to memory]")
+                        else:
+                            print("[Memory] Write buffer full - post not saved")
                 else:
                     print("Not connected. Use /connect first")
 
             elif user_input.lower() == "/timeline":
                 if agent.network_enabled:
-                    asyncio.run(agent.network_client.get_timeline())
+                    await agent.network_client.get_timeline()
                 else:
                     print("Not connected")
 
@@ -379,7 +533,7 @@ def main():
                     if len(parts) == 2:
                         post_id = int(parts[0])
                         content = parts[1]
-                        asyncio.run(agent.network_client.reply(post_id, content))
+                        await agent.network_client.reply(post_id, content)
                         print("[Reply sent]")
                 else:
                     print("Not connected")
@@ -389,14 +543,14 @@ def main():
                     parts = user_input[4:].split(maxsplit=1)
                     if len(parts) == 2:
                         to_id, message = parts
-                        asyncio.run(agent.network_client.dm(to_id, message))
+                        await agent.network_client.dm(to_id, message)
                         print(f"[DM sent]")
                 else:
                     print("Not connected")
 
             elif user_input.lower() == "/agents":
                 if agent.network_enabled:
-                    asyncio.run(agent.network_client.list_agents())
+                    await agent.network_client.list_agents()
                 else:
                     print("Not connected")
 
@@ -404,30 +558,30 @@ def main():
                 if not agent.network_enabled:
                     print("Not connected")
                 elif user_input.lower() == "/rpg start":
-                    asyncio.run(agent.network_client.rpg_start())
+                    await agent.network_client.rpg_start()
                     print("[RPG session started]")
                 elif user_input.lower() == "/rpg join":
-                    asyncio.run(agent.network_client.rpg_join())
+                    await agent.network_client.rpg_join()
                     print("[Joined RPG]")
                 elif user_input.lower().startswith("/rpg narrate "):
                     content = user_input[13:]
-                    asyncio.run(agent.network_client.rpg_narrate(content))
+                    await agent.network_client.rpg_narrate(content)
                 elif user_input.lower().startswith("/rpg action "):
                     content = user_input[12:]
-                    asyncio.run(agent.network_client.rpg_action(content))
+                    await agent.network_client.rpg_action(content)
 
             elif user_input.lower().startswith("/story"):
                 if not agent.network_enabled:
                     print("Not connected")
                 elif user_input.lower().startswith("/story new "):
                     title = user_input[11:]
-                    asyncio.run(agent.network_client.story_new(title))
+                    await agent.network_client.story_new(title)
                     print(f"[Story created]")
                 elif user_input.lower().startswith("/story add "):
                     parts = user_input[11:].split(maxsplit=1)
                     if len(parts) == 2:
                         story_id, content = parts
-                        asyncio.run(agent.network_client.story_add(story_id, content))
+                        await agent.network_client.story_add(story_id, content)
                         print("[Paragraph added]")
 
             # Local agent commands
@@ -435,14 +589,14 @@ def main():
                 print(f"\n{agent.load_soul()}\n")
 
             elif user_input.lower() == "/facts":
-                facts = agent.memory.get_all_facts()
+                facts = [m['text'] for m in agent.memory.memories if m.get('type') == 'fact']
                 print(f"\n[Facts Stored: {len(facts)}]")
                 for fact in facts:
                     print(f"  • {fact}")
                 print()
 
             elif user_input.lower() == "/clear":
-                agent.conversation_history = []
+                agent.clear_history()
                 print("[Conversation cleared]")
 
             elif user_input.lower().startswith("/auto "):
@@ -470,16 +624,17 @@ def main():
                     print()
 
             elif user_input.lower().startswith("/remember "):
-                # Manually save something to memory
+                # Manually save something to memory (written in the background)
                 fact = user_input[10:]
-                soul_updated = agent.memory.add_fact(fact, category="network")
-                print(f"[Remembered]: {fact}")
-                if soul_updated:
-                    print("[Soul] Updated")
+                if agent.memory_writer.add_fact(fact, category="network"):
+                    print(f"[Remembered]: {fact}")
+                else:
+                    print("[Memory] Write buffer full - not remembered, try again shortly")
 
             elif user_input.lower() == "/updatesoul":
-                # Manually trigger soul update
-                agent.memory.update_soul_if_needed(force=True)
+                # Manually trigger soul update, including facts still being written
+                await asyncio.to_thread(agent.memory_writer.flush)
+                await asyncio.to_thread(agent.memory.update_soul_if_needed, True)
                 print("[Soul] Force updated based on all memories")
 
             elif user_input.lower() == "/stats":
@@ -491,11 +646,31 @@ def main():
                 print(f"  Conversations: {len(agent.conversation_history)}")
                 print(f"  Network enabled: {agent.network_enabled}")
                 print(f"  Auto-respond: {agent.auto_respond}")
+                llm_stats = agent.llm.get_stats()
+                print(f"  LLM requests: {llm_stats['requests']} "
+                      f"({llm_stats['generations']} generated, {llm_stats['coalesced']} coalesced)")
+                reply_stats = agent.scheduler.get_stats()
+                print(f"  Replies: {reply_stats['done']} sent, {reply_stats['waiting']} waiting, "
+                      f"{reply_stats['dropped_stale'] + reply_stats['dropped_full']} dropped")
+                print()
+
+            elif user_input.lower().startswith("/perf"):
+                print_perf(agent.llm.perf)
+                if user_input.lower().endswith("dump"):
+                    print(f"\n[PERF] Wrote {agent.llm.perf.dump(PERF_DUMP_PATH)}")
                 print()
 
             else:
                 # Regular chat with your agent (with memory!)
-                response, soul_updated, compacted = agent.chat(user_input)
+                # Runs in a worker thread so network events keep flowing meanwhile;
+                # no new network replies start while the user is waiting
+                chat_cancel = CancelToken()
+                try:
+                    with agent.scheduler.interactive():
+                        response, soul_updated, compacted = await asyncio.to_thread(
+                            agent.chat, user_input, cancel=chat_cancel)
+                finally:
+                    chat_cancel = None
                 print(f"\n{agent.agent_name}: {response}\n")
 
                 # Show feedback
@@ -504,13 +679,101 @@ def main():
                 if compacted:
                     print("[Memory] Compacted memories")
 
-        except KeyboardInterrupt:
-            print("\n\nUse /quit to exit")
         except Exception as e:
             print(f"Error: {e}")
             import traceback
             traceback.print_exc()
 
+    await shutdown(agent)
+    print("Goodbye!")
+
+
+async def run_daemon(agent: "NetworkedPersonalAgent", server_url: str):
+    """Headless mode: stay connected and reply autonomously until SIGINT/SIGTERM"""
+    stop = asyncio.Event()
+    _on_signals(stop.set, signal.SIGINT, signal.SIGTERM)
+    agent.auto_respond = True
+
+    backoff = DAEMON_RECONNECT_MIN
+    last_status = time.monotonic()
+    while not stop.is_set():
+        # (Re)connect whenever the listener has died
+        if not agent.listen_task or agent.listen_task.done():
+            agent.network_enabled = False
+            try:
+                connected = await agent.connect_to_network(server_url)
+            except Exception as e:
+                print(f"[Daemon] Connection error: {e}")
+                connected = False
+            if connected:
+                backoff = DAEMON_RECONNECT_MIN
+            else:
+                print(f"[Daemon] Could not reach {server_url}, retrying in {backoff:.0f}s")
+                try:
+                    await asyncio.wait_for(stop.wait(), backoff)
+                except asyncio.TimeoutError:
+                    pass
+                backoff = min(backoff * 2, DAEMON_RECONNECT_MAX)
+                continue
+
+        if time.monotonic() - last_status >= DAEMON_STATUS_INTERVAL:
+            last_status = time.monotonic()
+            replies = agent.scheduler.get_stats()
+            print(f"[Daemon] {len(agent.timeline)} posts | replies {replies['done']} sent, "
+                  f"{replies['waiting']} waiting, {replies['dropped_stale'] + replies['dropped_full']} dropped | "
+                  f"{agent.memory_writer.pending} memory writes pending")
+
+        try:
+            await asyncio.wait_for(stop.wait(), 1.0)
+        except asyncio.TimeoutError:
+            pass
+
+    print("\n[Daemon] Shutting down...")
+    await shutdown(agent)
+
+
+def main():
+    """Main CLI loop"""
+    parser = argparse.ArgumentParser(description="Personal agent on AgentNet")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Run headless: connect, reply autonomously, no console")
+    parser.add_argument("--server", default="ws://localhost:8765", help="AgentNet server URL")
+    args = parser.parse_args()
+
+    print("="*60)
+    print("Personal Agent - AgentNet Edition")
+    print("Your agent with memory + network capabilities")
+    print("="*60)
+    print()
+
+    # Create agent
+    agent = NetworkedPersonalAgent()
+
+    print(f"Agent: {agent.agent_name}")
+    print(f"ID: {agent.agent_id}")
+    print(f"Model: {agent.model}")
+    print(f"Memories: {agent.memory.analyze_memories_for_soul()['facts']} facts stored")
+    print()
+
+    metrics_server = metrics.start_metrics_server()
+    if metrics_server:
+        agent.register_metrics()
+        print(f"Metrics: http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        print()
+
+    if args.daemon:
+        print(f"[Daemon] Running headless against {args.server} (Ctrl-C or SIGTERM to stop)")
+        asyncio.run(run_daemon(agent, args.server))
+        return
+
+    print("Commands:")
+    print("  /help - Show all commands")
+    print("  /connect [url] - Connect to AgentNet")
+    print("  /quit - Exit")
+    print()
+
+    asyncio.run(run_cli(agent))
+
 
 def show_help():
     """Show help"""
@@ -549,6 +812,7 @@ def show_help():
     print("  /remember <fact>      Manually save fact to memory")
     print("  /updatesoul           Force update soul.md")
     print("  /stats                Show agent statistics")
+    print("  /perf [dump]          Show Ollama timings (dump writes perf.json)")
 
     print("\n=== GENERAL ===")
     print("  /help                 This help")
@@ -0,0 +1,241 @@
+"""Performance metrics: Ollama server timings and per-phase latency spans
+
+Ollama reports where each call spent its time: loading the model
+(load_duration), reading the prompt (prompt_eval_*) and generating tokens
+(eval_*). PerfStore keeps the last PERF_SAMPLES calls so we can tell whether
+latency is prompt-bound, decode-bound or cold-load-bound.
+
+span() / timed() time the phases of a turn (retrieval, prompt build, LLM
+call, persistence, soul update, compaction) into HDR-style histograms, and
+append each span to PERF_TRACE_PATH when it is set.
+"""
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from config import PERF_SAMPLES, PERF_COLD_LOAD_MS, PERF_TRACE_PATH
+
+# Histogram precision: each power of two is split into 2**SUB_BUCKET_BITS buckets (~3% error)
+SUB_BUCKET_BITS = 5
+
+
+class PerfStore:
+    """Rolling window of per-call Ollama timings"""
+
+    def __init__(self, max_samples: int = PERF_SAMPLES):
+        """Initialize the store"""
+        self.samples: deque = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def record(self, model: str, call_type: str, response: Dict[str, Any], wall_time: float):
+        """Keep the timing fields of a finished call (durations are in nanoseconds)"""
+        def ms(field: str) -> float:
+            return round((response.get(field) or 0) / 1_000_000, 1)
+
+        sample = {
+            "timestamp": datetime.now().isoformat(),
+            "model": model,
+            "call_type": call_type,
+            "wall_ms": round(wall_time * 1000, 1),
+            "total_ms": ms("total_duration"),
+            "load_ms": ms("load_duration"),
+            "prompt_eval_count": response.get("prompt_eval_count") or 0,
+            "prompt_eval_ms": ms("prompt_eval_duration"),
+            "eval_count": response.get("eval_count") or 0,
+            "eval_ms": ms("eval_duration"),
+        }
+        sample["cold_load"] = sample["load_ms"] >= PERF_COLD_LOAD_MS
+
+        with self._lock:
+            self.samples.append(sample)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Aggregates per model and call type"""
+        with self._lock:
+            samples = list(self.samples)
+
+        groups: Dict[str, List[Dict]] = {}
+        for s in samples:
+            groups.setdefault(f"{s['model']} / {s['call_type']}", []).append(s)
+
+        return {name: _aggregate(group) for name, group in groups.items()}
+
+    def dump(self, path: Path) -> Path:
+        """Write the summary and raw samples as JSON"""
+        with self._lock:
+            samples = list(self.samples)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"summary": self.summary(), "spans": span_summary(), "samples": samples}, f, indent=2)
+        return path
+
+
+class LatencyHistogram:
+    """HDR-style latency histogram in microseconds with bounded relative error"""
+
+    def __init__(self):
+        """Initialize an empty histogram"""
+        self.buckets: Dict[tuple, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bucket(value_us: int) -> tuple:
+        """(shift, leading bits) - values below 2**SUB_BUCKET_BITS are exact"""
+        shift = max(0, value_us.bit_length() - SUB_BUCKET_BITS)
+        return shift, value_us >> shift
+
+    def record(self, seconds: float):
+        """Add one latency sample"""
+        value_us = max(0, int(seconds * 1_000_000))
+        key = self._bucket(value_us)
+        with self._lock:
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+            self.count += 1
+            self.total_us += value_us
+            self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+            self.max_us = max(self.max_us, value_us)
+
+    def percentile(self, p: float) -> float:
+        """Latency in ms at percentile p (0-100), rounded up to its bucket's upper bound"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = max(1, p / 100 * self.count)
+            seen = 0
+            for shift, lead in sorted(self.buckets, key=lambda k: k[1] << k[0]):
+                seen += self.buckets[(shift, lead)]
+                if seen >= target:
+                    upper = ((lead + 1) << shift) - 1
+                    return round(min(upper, self.max_us) / 1000, 3)
+            return round(self.max_us / 1000, 3)
+
+    def cumulative(self, bounds: Sequence[float]) -> List[int]:
+        """Samples at or below each bound in seconds (bucket upper bounds decide)"""
+        with self._lock:
+            buckets = [(((lead + 1) << shift) - 1, n) for (shift, lead), n in self.buckets.items()]
+        return [sum(n for upper, n in buckets if upper <= bound * 1_000_000) for bound in bounds]
+
+    def summary(self) -> Dict[str, float]:
+        """Count, mean and tail percentiles in ms"""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_us / self.count / 1000, 3) if self.count else 0.0,
+            "min_ms": round((self.min_us or 0) / 1000, 3),
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_us / 1000, 3),
+        }
+
+
+_spans: Dict[str, LatencyHistogram] = {}
+_spans_lock = threading.Lock()
+_trace_lock = threading.Lock()
+
+
+def record_span(name: str, seconds: float):
+    """Add a phase timing to its histogram (and the trace file, if enabled)"""
+    with _spans_lock:
+        histogram = _spans.get(name)
+        if histogram is None:
+            histogram = _spans[name] = LatencyHistogram()
+    histogram.record(seconds)
+
+    if PERF_TRACE_PATH:
+        entry = {"timestamp": datetime.now().isoformat(), "span": name, "ms": round(seconds * 1000, 3)}
+        try:
+            with _trace_lock, open(PERF_TRACE_PATH, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError:
+            pass  # Tracing must never break a turn
+
+
+@contextmanager
+def span(name: str):
+    """Time the enclosed block as a named phase"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - started)
+
+
+def timed(name: str):
+    """Decorator form of span()"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_spans() -> Dict[str, LatencyHistogram]:
+    """Snapshot of the phase histograms by name"""
+    with _spans_lock:
+        return dict(_spans)
+
+
+def span_summary() -> Dict[str, Dict[str, float]]:
+    """Histogram summaries for every phase seen so far"""
+    spans = get_spans()
+    return {name: spans[name].summary() for name in sorted(spans)}
+
+
+def _aggregate(samples: List[Dict]) -> Dict[str, Any]:
+    """Throughput, time split and bottleneck for a group of samples"""
+    total = sum(s["total_ms"] for s in samples) or 1
+    load = sum(s["load_ms"] for s in samples)
+    prompt = sum(s["prompt_eval_ms"] for s in samples)
+    decode = sum(s["eval_ms"] for s in samples)
+
+    shares = {"cold-load-bound": load / total, "prompt-bound": prompt / total, "decode-bound": decode / total}
+    return {
+        "calls": len(samples),
+        "avg_wall_ms": round(sum(s["wall_ms"] for s in samples) / len(samples), 1),
+        "decode_tokens_per_sec": _rate(sum(s["eval_count"] for s in samples), decode),
+        "prompt_tokens_per_sec": _rate(sum(s["prompt_eval_count"] for s in samples), prompt),
+        "prompt_eval_share": round(shares["prompt-bound"], 3),
+        "load_share": round(shares["cold-load-bound"], 3),
+        "cold_loads": sum(s["cold_load"] for s in samples),
+        "bound": max(shares, key=shares.get) if decode or prompt or load else "unknown",
+    }
+
+
+def _rate(tokens: int, duration_ms: float) -> Optional[float]:
+    return round(tokens / (duration_ms / 1000), 1) if duration_ms else None
+
+
+def print_perf(store: PerfStore):
+    """Print the /perf report"""
+    spans = span_summary()
+    if spans:
+        print("\n[PERF] Phase latency (ms):")
+        print(f"  {'phase':22} {'count':>7} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+        for name, stats in spans.items():
+            print(f"  {name:22} {stats['count']:>7} {stats['p50_ms']:>9} {stats['p90_ms']:>9} "
+                  f"{stats['p99_ms']:>9} {stats['max_ms']:>9}")
+
+    summary = store.summary()
+    if not summary:
+        print("\n[PERF] No LLM calls recorded yet")
+        return
+
+    print(f"\n[PERF] Last {len(store.samples)} LLM calls:")
+    for name, stats in summary.items():
+        print(f"\n  {name}: {stats['calls']} calls, avg {stats['avg_wall_ms']}ms ({stats['bound']})")
+        print(f"    Decode: {stats['decode_tokens_per_sec']} tok/s | Prompt: {stats['prompt_tokens_per_sec']} tok/s")
+        print(f"    Prompt eval share: {stats['prompt_eval_share']:.0%} | Load share: {stats['load_share']:.0%}"
+              f" | Cold loads: {stats['cold_loads']}")
@@ -0,0 +1,170 @@
+"""Prioritized, rate-limited scheduler for autonomous AgentNet replies
+
+Replies wait in a priority queue (mentions, then DMs, then random
+engagement) and are generated by at most REPLY_MAX_CONCURRENCY workers, no
+faster than a token bucket allows. A reply that waited longer than its
+REPLY_STALE_AFTER deadline is dropped rather than answering an old post, and
+no new reply starts while the local user's turn is running.
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import (REPLY_MAX_CONCURRENCY, REPLY_RATE_PER_MINUTE, REPLY_BURST, REPLY_QUEUE_MAX,
+                    REPLY_STALE_AFTER)
+
+# Lower runs first
+PRIORITIES = {"mention": 1, "dm": 2, "random": 3}
+
+Job = Callable[[], Awaitable[None]]
+
+
+class TokenBucket:
+    """Allows `burst` actions at once, refilled at `rate` per second"""
+
+    def __init__(self, rate: float, burst: int):
+        """Initialize a full bucket"""
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0, or the seconds to wait before one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+
+class ReplyScheduler:
+    """Priority queue of reply jobs run by a few workers on the event loop"""
+
+    def __init__(self, max_concurrency: int = REPLY_MAX_CONCURRENCY,
+                 rate_per_minute: float = REPLY_RATE_PER_MINUTE, burst: int = REPLY_BURST,
+                 max_queue: int = REPLY_QUEUE_MAX, stale_after: Optional[Dict[str, float]] = None):
+        """Initialize the scheduler (workers start with the first job)"""
+        self.max_concurrency = max(1, max_concurrency)
+        self.bucket = TokenBucket(rate_per_minute / 60, burst)
+        self.max_queue = max_queue
+        self.stale_after = stale_after if stale_after is not None else REPLY_STALE_AFTER
+        self._queue: List[Tuple[int, int, float, str, Job]] = []  # (priority, seq, queued at, kind, job)
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._interactive = 0
+        self._interactive_lock = threading.Lock()
+        self.running = 0
+        self.counters = {"queued": 0, "done": 0, "failed": 0, "dropped_stale": 0, "dropped_full": 0}
+
+    def submit(self, kind: str, job: Job, queued_at: Optional[float] = None) -> bool:
+        """Queue a reply job (call from the event loop); False if it was dropped"""
+        self._ensure_workers()
+        entry = (PRIORITIES.get(kind, max(PRIORITIES.values())), next(self._seq),
+                 queued_at if queued_at is not None else time.time(), kind, job)
+
+        if len(self._queue) >= self.max_queue:
+            # Full: make room by dropping the lowest-priority, newest job (maybe this one)
+            worst = max(self._queue)
+            if entry > worst:
+                self.counters["dropped_full"] += 1
+                return False
+            self._queue.remove(worst)
+            heapq.heapify(self._queue)
+            self.counters["dropped_full"] += 1
+
+        heapq.heappush(self._queue, entry)
+        self.counters["queued"] += 1
+        self._wakeup.set()
+        return True
+
+    @contextmanager
+    def interactive(self):
+        """Hold back new replies while the local user's turn runs (any thread)"""
+        with self._interactive_lock:
+            self._interactive += 1
+        try:
+            yield
+        finally:
+            with self._interactive_lock:
+                self._interactive -= 1
+
+    def _ensure_workers(self):
+        """Start workers on the running loop (again, if the loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._workers = [loop.create_task(self._worker()) for _ in range(self.max_concurrency)]
+
+    def _pop_fresh(self) -> Optional[Tuple[str, Job]]:
+        """Next job that hasn't gone stale, or None if the queue is empty"""
+        while self._queue:
+            _, _, queued_at, kind, job = heapq.heappop(self._queue)
+            max_age = self.stale_after.get(kind)
+            if max_age is not None and time.time() - queued_at > max_age:
+                self.counters["dropped_stale"] += 1
+                continue
+            return kind, job
+        return None
+
+    async def _worker(self):
+        """Run jobs in priority order, within the rate limit"""
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # The user's own turn goes first; wait it out before starting anything
+            while self._interactive:
+                await asyncio.sleep(0.05)
+
+            delay = self.bucket.take()
+            if delay:
+                await asyncio.sleep(min(delay, 60))
+                continue
+
+            item = self._pop_fresh()
+            if item is None:
+                self.bucket.tokens = min(self.bucket.burst, self.bucket.tokens + 1)  # Nothing ran, give it back
+                continue
+
+            kind, job = item
+            self.running += 1
+            try:
+                await job()
+                self.counters["done"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters["failed"] += 1
+                print(f"[Scheduler] {kind} reply failed: {e}")
+            finally:
+                self.running -= 1
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting to run"""
+        return len(self._queue)
+
+    async def close(self):
+        """Drop waiting jobs and stop the workers"""
+        self._queue.clear()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def get_stats(self) -> Dict[str, int]:
+        """Scheduler statistics"""
+        return {**self.counters, "waiting": len(self._queue), "running": self.running}
@@ -1,13 +1,26 @@
 """Simplified Ollama Agent (no heavy dependencies)"""
-import ollama
+import glob
+import os
 import sys
 import time
+import hashlib
+import json
 import threading
-import subprocess
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List
 from simple_memory import SimpleMemory
-from config import OLLAMA_MODEL, VISION_MODEL, SOUL_PATH
+from llm_client import CancelToken, LLMClient, LLMCancelled, ResponseCache, get_client
+from model_router import ModelRouter, get_router
+from perf import print_perf, span
+from image_pipeline import file_digest, prepare_image
+from config import (OLLAMA_MODEL, VISION_MODEL, DEFAULT_USER_ID, OLLAMA_NUM_PARALLEL,
+                    HISTORY_WINDOW, HISTORY_SUMMARY_ENABLED, HISTORY_SUMMARY_BATCH,
+                    HISTORY_SUMMARY_MAX_CHARS, HISTORY_SUMMARY_MAX_PENDING, PERF_DUMP_PATH, GENERATION_PROFILES,
+                    VISION_CACHE_ENABLED, VISION_CACHE_DIR, VISION_CACHE_MAX_ENTRIES, VISION_CACHE_TTL,
+                    VISION_PREPROCESS_CACHE_DIR, VISION_CONCURRENCY, VISION_MAX_IMAGES,
+                    VISION_PREFILL_ENABLED, VISION_SHOW_TIMINGS)
 
 
 class ThinkingIndicator:
@@ -48,19 +61,34 @@ class ThinkingIndicator:
 class SimpleAgent:
     """Ollama-powered agent with lightweight memory"""
 
-    def __init__(self, model: str = OLLAMA_MODEL, vision_model: str = VISION_MODEL):
+    def __init__(self, model: str = OLLAMA_MODEL, vision_model: str = VISION_MODEL,
+                 user_id: str = DEFAULT_USER_ID, memory: Optional[SimpleMemory] = None,
+                 llm: Optional[LLMClient] = None, router: Optional[ModelRouter] = None,
+                 vision_cache: Optional[ResponseCache] = None):
         """Initialize the agent"""
         self.model = model
         self.vision_model = vision_model
-        self.memory = SimpleMemory()
-        self.conversation_history: List[Dict] = []
+        self.llm = llm or get_client()
+        self.vision_cache = vision_cache or ResponseCache(VISION_CACHE_DIR, VISION_CACHE_MAX_ENTRIES,
+                                                          VISION_CACHE_TTL)
+        self.image_cache_dir = VISION_PREPROCESS_CACHE_DIR  # Preprocessed images, by content hash
+        self.router = router or (ModelRouter(llm) if llm else get_router())
+        # Pass a store from MemoryManager to share it across agents serving one user
+        self.memory = memory if memory is not None else SimpleMemory(user_id)
+        self.show_thinking = True  # Animated indicator; off when serving requests
+
+        # Recent turns are kept verbatim; older ones are folded into history_summary
+        self.conversation_history: deque = deque(maxlen=HISTORY_WINDOW + HISTORY_SUMMARY_BATCH)
+        self.history_summary = ""
+        self._summary_pending: List[Dict] = []
+        self._summary_running = False
+        self._history_generation = 0  # Bumped by clear_history so stale summaries are dropped
+        self._history_lock = threading.Lock()
 
     def load_soul(self) -> str:
-        """Load the current soul.md content"""
-        if SOUL_PATH.exists():
-            with open(SOUL_PATH, 'r', encoding='utf-8') as f:
-                return f.read()
-        return "No soul file found."
+        """Load the soul of this agent's memory store"""
+        soul = self.memory.load_soul()
+        return soul if soul is not None else "No soul file found."
 
     def get_system_prompt(self) -> str:
         """Generate system prompt including soul and relevant memories"""
@@ -82,18 +110,21 @@ The user expects you to remember facts they've taught you and conversations you'
 
         return system_prompt
 
-    def chat(self, user_message: str, save_to_memory: bool = True,
-             include_context: bool = True) -> tuple[str, bool, bool]:
-        """Chat with the agent"""
+    def _build_messages(self, user_message: str, include_context: bool = True,
+                        use_history: bool = True) -> List[Dict]:
+        """Assemble the prompt: soul, relevant memories, history and the new message"""
 
         # Get relevant context from memory
         context = ""
         if include_context:
-            context = self.memory.get_context_for_query(user_message)
+            with span("chat.retrieve"):
+                context = self.memory.get_context_for_query(user_message)
 
         # Build messages for Ollama
+        with span("chat.soul"):
+            system_prompt = self.get_system_prompt()
         messages = [
-            {"role": "system", "content": self.get_system_prompt()}
+            {"role": "system", "content": system_prompt}
         ]
 
         # Add context if available
@@ -103,41 +134,233 @@ The user expects you to remember facts they've taught you and conversations you'
                 "content": f"=== RELEVANT MEMORIES FROM PAST INTERACTIONS ===\n\n{context}\n\n=== USE THESE MEMORIES IN YOUR RESPONSE ==="
             })
 
-        # Add conversation history (last 10 messages)
-        messages.extend(self.conversation_history[-10:])
+        if use_history:
+            # Add rolling summary of turns that fell out of the window
+            if self.history_summary:
+                messages.append({
+                    "role": "system",
+                    "content": f"=== SUMMARY OF EARLIER CONVERSATION ===\n\n{self.history_summary}"
+                })
+
+            # Add conversation history (last HISTORY_WINDOW messages)
+            messages.extend(list(self.conversation_history)[-HISTORY_WINDOW:])
 
         # Add current message
         messages.append({"role": "user", "content": user_message})
+        return messages
+
+    def _generate(self, messages: List[Dict], call_type: str = "chat",
+                  stop_when: Optional[Callable[[str], bool]] = None,
+                  cancel: Optional[CancelToken] = None) -> str:
+        """Send messages to the routed text model and return its reply"""
+        decision = self.router.route(call_type, messages[-1]["content"], messages, self.model)
+        started = time.perf_counter()
+        response = self.llm.chat(
+            model=decision["model"],
+            messages=messages,
+            call_type=call_type,
+            stop_when=stop_when,
+            cancel=cancel
+        )
+        self.router.record(decision, time.perf_counter() - started, cached=bool(response.get("_cached")))
+        return response['message']['content']
+
+    def _connection_error(self, error: Exception) -> str:
+        """User-facing message for a failed LLM call"""
+        return f"Error connecting to Ollama: {error}\n\nMake sure Ollama is running and the model '{self.model}' is available."
+
+    def chat(self, user_message: str, save_to_memory: bool = True,
+             include_context: bool = True, call_type: str = "chat",
+             stop_when: Optional[Callable[[str], bool]] = None,
+             cancel: Optional[CancelToken] = None) -> tuple[str, bool, bool]:
+        """Chat with the agent (call_type picks the generation profile, stop_when or cancel can end it early)"""
+        with span("chat.total"):
+            return self._chat(user_message, save_to_memory, include_context, call_type, stop_when,
+                              cancel=cancel)
+
+    def _chat(self, user_message: str, save_to_memory: bool, include_context: bool,
+              call_type: str, stop_when: Optional[Callable[[str], bool]],
+              messages: Optional[List[Dict]] = None,
+              cancel: Optional[CancelToken] = None) -> tuple[str, bool, bool]:
+        """One chat turn, timed phase by phase (messages may be prepared by the caller)"""
+        if messages is None:
+            with span("chat.prompt"):
+                messages = self._build_messages(user_message, include_context)
 
         # Get response from Ollama with thinking indicator
         thinking = ThinkingIndicator()
-        thinking.start()
+        if self.show_thinking:
+            thinking.start()
 
         try:
-            response = ollama.chat(
-                model=self.model,
-                messages=messages
-            )
-            agent_response = response['message']['content']
+            with span("chat.llm"):
+                agent_response = self._generate(messages, call_type, stop_when, cancel)
+        except LLMCancelled:
+            # Ctrl-C during generation: drop this turn but keep the session
+            return "[Generation cancelled]", False, False
         except Exception as e:
-            agent_response = f"Error connecting to Ollama: {e}\n\nMake sure Ollama is running and the model '{self.model}' is available."
+            agent_response = self._connection_error(e)
         finally:
             thinking.stop()
 
         # Update conversation history
-        self.conversation_history.append({"role": "user", "content": user_message})
-        self.conversation_history.append({"role": "assistant", "content": agent_response})
+        self._append_history(user_message, agent_response)
 
         # Save to memory
         soul_updated = False
         compacted = False
         if save_to_memory:
-            self.memory.add_conversation(user_message, agent_response)
-            soul_updated = self.memory.update_soul_if_needed()
-            compacted = self.memory._check_auto_compact()
+            with span("chat.persist"):
+                self.memory.add_conversation(user_message, agent_response)
+            with span("chat.soul_update"):
+                soul_updated = self.memory.update_soul_if_needed()
+            with span("chat.compact"):
+                compacted = self.memory._check_auto_compact()
 
         return agent_response, soul_updated, compacted
 
+    def chat_batch(self, prompts: List[str], concurrency: int = OLLAMA_NUM_PARALLEL,
+                   save_to_memory: bool = True, include_context: bool = True) -> tuple[List[str], Dict]:
+        """
+        Run many independent prompts through the agent with bounded concurrency.
+
+        Context retrieval and LLM calls run on a worker pool sized to the
+        Ollama server's parallel slots, while this thread writes finished
+        answers to memory in order. Batch prompts don't see or extend the
+        interactive conversation history.
+
+        Returns:
+            (responses in prompt order, stats dict with aggregate throughput)
+        """
+        def answer(prompt: str) -> tuple[str, bool, float]:
+            started = time.perf_counter()
+            try:
+                messages = self._build_messages(prompt, include_context, use_history=False)
+                return self._generate(messages), True, time.perf_counter() - started
+            except Exception as e:
+                return self._connection_error(e), False, time.perf_counter() - started
+
+        concurrency = max(1, min(concurrency, len(prompts) or 1))
+        responses: List[str] = []
+        latencies: List[float] = []
+        errors = 0
+        soul_updated = False
+        cache_hits_before = self.llm.get_stats()["cache_hits"]
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(answer, prompt) for prompt in prompts]
+
+            # Persist in order while later prompts are still generating
+            for prompt, future in zip(prompts, futures):
+                response, ok, latency = future.result()
+                responses.append(response)
+                latencies.append(latency)
+                if not ok:
+                    errors += 1
+                elif save_to_memory:
+                    self.memory.add_conversation(prompt, response, metadata={"batch": True})
+                    soul_updated = self.memory.update_soul_if_needed() or soul_updated
+
+        compacted = self.memory._check_auto_compact() if save_to_memory else False
+        elapsed = time.perf_counter() - started
+
+        stats = {
+            "prompts": len(prompts),
+            "errors": errors,
+            "concurrency": concurrency,
+            "elapsed": round(elapsed, 3),
+            "prompts_per_sec": round(len(prompts) / elapsed, 3) if elapsed > 0 else 0.0,
+            "avg_latency": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "cache_hits": self.llm.get_stats()["cache_hits"] - cache_hits_before,
+            "soul_updated": soul_updated,
+            "compacted": compacted,
+        }
+        return responses, stats
+
+    def _append_history(self, user_message: str, agent_response: str):
+        """Append a turn, moving messages that leave the window to the summarizer"""
+        with self._history_lock:
+            overflow = len(self.conversation_history) + 2 - self.conversation_history.maxlen
+            if overflow > 0:
+                # Trim back down to the window so summarization runs in batches
+                trim = len(self.conversation_history) + 2 - HISTORY_WINDOW
+                evicted = [self.conversation_history.popleft() for _ in range(trim)]
+                if HISTORY_SUMMARY_ENABLED:
+                    self._summary_pending.extend(evicted)
+                    self._cap_summary_pending()
+                    if not self._summary_running:
+                        self._summary_running = True
+                        threading.Thread(target=self._summarize_pending, daemon=True).start()
+
+            self.conversation_history.append({"role": "user", "content": user_message})
+            self.conversation_history.append({"role": "assistant", "content": agent_response})
+
+    def _summarize_pending(self):
+        """Background worker: fold pending messages into the rolling summary"""
+        # One rollover's worth per call keeps the prompt within the summarize profile's context
+        chunk = HISTORY_SUMMARY_BATCH + 2
+        while True:
+            with self._history_lock:
+                batch = self._summary_pending[:chunk]
+                self._summary_pending = self._summary_pending[chunk:]
+                previous = self.history_summary
+                generation = self._history_generation
+                if not batch:
+                    self._summary_running = False
+                    return
+
+            summary = self._summarize_history(previous, batch)
+
+            with self._history_lock:
+                if generation != self._history_generation:
+                    continue  # History was cleared meanwhile; this summary belongs to the old conversation
+                if summary is None:
+                    # Put the batch back so the next rollover retries it instead of losing it
+                    self._summary_pending = batch + self._summary_pending
+                    self._cap_summary_pending()
+                    self._summary_running = False
+                    return
+                self.history_summary = summary
+
+    def _cap_summary_pending(self):
+        """Drop the oldest unsummarized messages beyond HISTORY_SUMMARY_MAX_PENDING (call with the lock held)"""
+        dropped = len(self._summary_pending) - HISTORY_SUMMARY_MAX_PENDING
+        if dropped > 0:
+            dropped += dropped % 2  # Whole user/assistant turns
+            self._summary_pending = self._summary_pending[dropped:]
+            print(f"[HISTORY] Summarizer unavailable - dropped {dropped} old messages from the summary queue")
+
+    def _summarize_history(self, previous: str, messages: List[Dict]) -> Optional[str]:
+        """Condense older messages plus the previous summary into a new summary (None on error)"""
+        transcript = "\n".join(f"{m['role'].capitalize()}: {m['content']}" for m in messages)
+        prompt = f"""Update the running summary of a conversation between a user and an AI agent.
+
+Current summary:
+{previous or "(none yet)"}
+
+New exchanges to fold in:
+{transcript}
+
+Write a concise summary (under 200 words) of the whole conversation so far.
+Keep names, facts, preferences, decisions and open questions. Reply with the summary only."""
+
+        try:
+            summary = self._generate([{"role": "user", "content": prompt}], call_type="summarize").strip()
+        except Exception:
+            # Transient error: the caller keeps the old summary and retries these messages later
+            return None
+
+        return summary[:HISTORY_SUMMARY_MAX_CHARS]
+
+    def clear_history(self):
+        """Forget the current conversation, including its rolling summary"""
+        with self._history_lock:
+            self.conversation_history.clear()
+            self._summary_pending = []
+            self.history_summary = ""
+            self._history_generation += 1
+
     def learn_fact(self, fact: str, category: Optional[str] = None) -> tuple[str, bool, bool]:
         """Explicitly teach the agent a fact"""
         result = self.memory.add_fact(fact, category)
@@ -168,40 +391,80 @@ The user expects you to remember facts they've taught you and conversations you'
         """Force an update to soul.md"""
         self.memory.update_soul_if_needed(force=True)
 
-    def analyze_image(self, image_path: str, prompt: str = "Describe this image in detail") -> str:
+    def _vision_key(self, digest: str, prompt: str) -> str:
+        """Hash of the image content, vision model, prompt and options"""
+        payload = json.dumps({"image": digest, "model": self.vision_model, "prompt": prompt,
+                              "options": GENERATION_PROFILES.get("vision", {})}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def analyze_image(self, image_path: str, prompt: str = "Describe this image in detail",
+                      verbose: bool = True, cancel: Optional[CancelToken] = None) -> str:
         """Use vision model to extract information from an image"""
         from pathlib import Path
+        log = print if verbose else (lambda *args, **kwargs: None)
 
         # Verify image exists
         img_path = Path(image_path)
         if not img_path.exists():
             return f"Error: Image file not found at {image_path}"
 
-        print(f"  Analyzing image with {self.vision_model}...", end="", flush=True)
-
         try:
-            # Use absolute path
-            abs_path = str(img_path.absolute())
+            digest = file_digest(img_path)
+        except OSError as e:
+            return f"Error analyzing image: {e}"
+
+        key = self._vision_key(digest, prompt) if VISION_CACHE_ENABLED else None
+        if key:
+            description = self.vision_cache.get(key)
+            if description is not None:
+                log(f"  Analyzing image with {self.vision_model}... Done! (cached)")
+                return description
 
-            response = ollama.chat(
+        if cancel is not None and cancel.cancelled:
+            return "Error analyzing image: cancelled"
+
+        try:
+            # Downscaled, metadata-free JPEG at the vision model's input size
+            prepared = prepare_image(img_path, self.vision_model, digest=digest, cache_dir=self.image_cache_dir)
+            if prepared["size"]:
+                (w, h), (nw, nh) = prepared["original_size"], prepared["size"]
+                stages = ", ".join(f"{name} {ms:.0f}ms" for name, ms in prepared["timings"].items())
+                log(f"  Preprocessed {w}x{h} -> {nw}x{nh}, "
+                      f"{prepared['original_bytes'] // 1024}KB -> {prepared['bytes'] // 1024}KB ({stages})")
+
+            log(f"  Analyzing image with {self.vision_model}...", end="", flush=True)
+            started = time.perf_counter()
+            response = self.llm.chat(
                 model=self.vision_model,
                 messages=[{
                     'role': 'user',
                     'content': prompt,
-                    'images': [abs_path]
-                }]
+                    'images': [prepared["data"]]
+                }],
+                call_type="vision",
+                cancel=cancel
             )
             description = response['message']['content']
-            print(" Done!")
+            elapsed = time.perf_counter() - started
+            log(f" Done! ({'cached, ' if response.get('_cached') else ''}{elapsed:.2f}s)")
 
             # Debug: show first 100 chars of description
-            print(f"\n  Vision model said: {description[:100]}...")
+            log(f"\n  Vision model said: {description[:100]}...")
 
+            if key:
+                try:
+                    self.vision_cache.put(key, description)
+                except OSError:
+                    pass  # A cache write failure shouldn't fail the call
             return description
+        except LLMCancelled:
+            log(" Cancelled")
+            return "Error analyzing image: cancelled"
         except Exception as e:
-            print(f" Error!")
-            import traceback
-            traceback.print_exc()
+            log(f" Error!")
+            if verbose:
+                import traceback
+                traceback.print_exc()
             return f"Error analyzing image: {e}"
 
     def chat_with_image(self, user_message: str, image_path: str,
@@ -209,18 +472,125 @@ The user expects you to remember facts they've taught you and conversations you'
                        save_to_memory: bool = True) -> tuple[str, bool, bool]:
         """Chat about an image - vision model describes it, text model responds"""
 
-        # Step 1: Get image description from vision model
-        image_description = self.analyze_image(image_path, image_prompt)
-
-        # Step 2: Create enhanced message with image context
-        enhanced_message = f"""[Image provided: {image_path}]
+        # Step 1: Get image description from vision model (memories are retrieved meanwhile)
+        def describe(cancel: CancelToken) -> str:
+            image_description = self.analyze_image(image_path, image_prompt, cancel=cancel)
+            return f"[Image provided: {image_path}]\n\nVision Analysis: {image_description}"
+
+        # Steps 2-3: Add the description to the prepared prompt and run the text model
+        return self._chat_about_images(user_message, describe, save_to_memory)
+
+    def _chat_about_images(self, user_message: str, describe: Callable[[CancelToken], str],
+                           save_to_memory: bool) -> tuple[str, bool, bool]:
+        """
+        Run the vision step on a worker while memories are retrieved and the
+        prompt is assembled here, then answer with the text model.
+
+        Retrieval uses the user's question rather than the vision output, so it
+        doesn't have to wait for it. With VISION_PREFILL_ENABLED the text model
+        also prompt-evaluates the soul/memories/history prefix in the meantime.
+        Ctrl-C cancels the vision step along with the turn.
+        """
+        started = time.perf_counter()
+        timings = {}
+        cancel = CancelToken()
+
+        def vision() -> str:
+            vision_started = time.perf_counter()
+            with span("image.vision"):
+                result = describe(cancel)
+            timings["vision"] = time.perf_counter() - vision_started
+            return result
+
+        pool = ThreadPoolExecutor(max_workers=1)
+        try:
+            description = pool.submit(vision)
+
+            prepare_started = time.perf_counter()
+            with span("image.prepare"):
+                messages = self._build_messages(user_message, include_context=True)
+                if VISION_PREFILL_ENABLED:
+                    self._prefill(messages, cancel)
+            timings["prepare"] = time.perf_counter() - prepare_started
+
+            image_context = description.result()
+        except (KeyboardInterrupt, LLMCancelled):
+            cancel.cancel()
+            return "[Generation cancelled]", False, False
+        finally:
+            pool.shutdown()  # After a cancel the vision call aborts within its next check
+
+        if VISION_SHOW_TIMINGS:
+            # Always recorded as the image.vision / image.prepare spans for /perf
+            overlap = timings["vision"] + timings["prepare"] - (time.perf_counter() - started)
+            print(f"  [TIMING] vision {timings['vision']:.2f}s | memories + prompt {timings['prepare']:.2f}s "
+                  f"(overlapped, saved {max(0.0, overlap):.2f}s)")
+
+        enhanced_message = f"{image_context}\n\nUser Question: {user_message}"
+        messages[-1] = {"role": "user", "content": enhanced_message}
+        with span("chat.total"):
+            return self._chat(enhanced_message, save_to_memory, True, "chat", None, messages=messages)
+
+    def _prefill(self, messages: List[Dict], cancel: Optional[CancelToken] = None):
+        """Have the text model evaluate everything but the final message so its KV cache is warm"""
+        model = self.router.route("chat", messages[-1]["content"], messages, self.model)["model"]
+        # Same num_ctx as the real call, or Ollama reloads the model and the cache is lost
+        options = {**GENERATION_PROFILES.get("chat", {}), "num_predict": 1}
+        try:
+            self.llm.chat(model=model, messages=messages[:-1], options=options, call_type="prefill",
+                          cancel=cancel)
+        except LLMCancelled:
+            raise  # Ctrl-C: the whole turn is cancelled
+        except Exception:
+            pass  # Only an optimization; the real call reports errors
+
+    def analyze_images(self, image_paths: List[str], prompt: str = "Describe this image in detail",
+                       concurrency: int = VISION_CONCURRENCY,
+                       on_result: Optional[Callable[[str, str], None]] = None,
+                       cancel: Optional[CancelToken] = None) -> List[tuple[str, str]]:
+        """
+        Describe many images with bounded concurrency.
+
+        on_result(path, description) is called as each image finishes, in
+        completion order. Returns (path, description) pairs in input order.
+        Raises LLMCancelled if `cancel` fires or Ctrl-C is hit; images that
+        haven't started are skipped and running ones are aborted.
+        """
+        cancel = cancel or CancelToken()
+        concurrency = max(1, min(concurrency, len(image_paths) or 1))
+        pool = ThreadPoolExecutor(max_workers=concurrency)
+        futures = {pool.submit(self.analyze_image, path, prompt, False, cancel): path for path in image_paths}
+        descriptions = {}
+        try:
+            pending = set(futures)
+            while pending and not cancel.cancelled:
+                done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = futures[future]
+                    descriptions[path] = future.result()
+                    if on_result and not cancel.cancelled:
+                        on_result(path, descriptions[path])
+        except KeyboardInterrupt:
+            cancel.cancel()
+        finally:
+            pool.shutdown(cancel_futures=True)
 
-Vision Analysis: {image_description}
+        if cancel.cancelled:
+            raise LLMCancelled("Image analysis cancelled")
+        return [(path, descriptions[path]) for path in image_paths]
 
-User Question: {user_message}"""
+    def chat_with_images(self, user_message: str, image_paths: List[str],
+                         image_prompt: str = "Describe what you see in this image in detail",
+                         save_to_memory: bool = True,
+                         on_result: Optional[Callable[[str, str], None]] = None) -> tuple[str, bool, bool]:
+        """Chat about several images - all are described concurrently, then one text-model turn"""
+        def describe(cancel: CancelToken) -> str:
+            results = self.analyze_images(image_paths, image_prompt, on_result=on_result, cancel=cancel)
+            analyses = "\n\n".join(f"Image {i} ({path}): {description}"
+                                    for i, (path, description) in enumerate(results, 1))
+            return f"[Images provided: {len(results)}]\n\n{analyses}"
 
-        # Step 3: Use regular chat with the enhanced context
-        return self.chat(enhanced_message, save_to_memory=save_to_memory, include_context=True)
+        return self._chat_about_images(user_message, describe, save_to_memory)
 
     def commit_conversation(self, num_exchanges: int = 1) -> str:
         """Manually commit recent conversation exchanges to memory"""
@@ -233,7 +603,7 @@ User Question: {user_message}"""
 
         # Calculate how many messages to get (2 per exchange)
         num_messages = min(num_exchanges * 2, history_len)
-        recent_history = self.conversation_history[-num_messages:]
+        recent_history = list(self.conversation_history)[-num_messages:]
 
         # Pair up user and assistant messages
         for i in range(0, len(recent_history), 2):
@@ -251,6 +621,8 @@ User Question: {user_message}"""
 
 def auto_git_commit():
     """Automatically commit changes to git on quit"""
+    import subprocess  # Only needed on quit
+
     try:
         # Check if there are changes to commit
         status = subprocess.run(['git', 'status', '--porcelain'],
@@ -343,6 +715,9 @@ def main():
                 print("\n  /stats")
                 print("    Show memory growth statistics")
                 print("    Displays hot/archive counts and knowledge areas")
+                print("\n  /perf [dump]")
+                print("    Show Ollama timings: tokens/sec, prompt-eval share, cold loads")
+                print("    'dump' writes the samples to memory_store/perf.json")
                 print("\n  /compact")
                 print("    Manually compact memories (move old to archive)")
                 print("    Auto-compaction happens at 1000 memories")
@@ -350,6 +725,9 @@ def main():
                 print("    Analyze an image and ask questions about it")
                 print("    Vision model extracts info, text model responds")
                 print("    Example: /image photo.jpg What do you see?")
+                print("\n  /images <glob> [question]")
+                print("    Describe several images at once, then ask about all of them")
+                print("    Example: /images screenshots/*.png What changed between these?")
                 print("\n  /quit")
                 print("    Exit the agent")
                 print("\n" + "="*60)
@@ -404,11 +782,24 @@ def main():
                 print(f"\n  Conversations: {stats['conversations']}")
                 print(f"  Facts: {stats['facts']}")
                 print(f"  Tasks: {stats['tasks']}")
+                llm_stats = agent.llm.get_stats()
+                print(f"\n  LLM requests: {llm_stats['requests']} "
+                      f"({llm_stats['generations']} generated, {llm_stats['coalesced']} coalesced)")
+                vision_stats = agent.vision_cache.get_stats()
+                if vision_stats['hits'] or vision_stats['misses']:
+                    print(f"  Vision cache: {vision_stats['hits']} hits, {vision_stats['misses']} misses")
+                for tier, tier_stats in agent.router.get_stats().items():
+                    print(f"  Model tier {tier}: {tier_stats['calls']} calls, avg {tier_stats['avg_latency']}s")
                 if stats['knowledge_areas']:
                     print(f"\n  I've been learning about:")
                     for area, count in stats['knowledge_areas'].items():
                         print(f"    • {area}: {count} {'fact' if count == 1 else 'facts'}")
 
+            elif user_input.lower().startswith("/perf"):
+                print_perf(agent.llm.perf)
+                if user_input.lower().endswith("dump"):
+                    print(f"\n[PERF] Wrote {agent.llm.perf.dump(PERF_DUMP_PATH)}")
+
             elif user_input.lower() == "/compact":
                 stats_before = agent.memory.get_stats()
                 compact_stats = agent.memory.compact_memories(force=True)
@@ -433,6 +824,35 @@ def main():
                     stats = agent.memory.get_stats()
                     print(f"\n  (Memory organized: {stats['hot']} active, {stats['archive']} archived)")
 
+            elif user_input.lower().startswith("/images "):
+                parts = user_input[8:].strip().split(None, 1)
+                if not parts:
+                    print("\n[ERROR] Usage: /images <glob> [question]")
+                    continue
+
+                image_paths = sorted(glob.glob(os.path.expanduser(parts[0])))
+                question = parts[1] if len(parts) > 1 else "What do these images show?"
+                if not image_paths:
+                    print(f"\n[ERROR] No files match {parts[0]}")
+                    continue
+                if len(image_paths) > VISION_MAX_IMAGES:
+                    print(f"\n[IMAGE] {len(image_paths)} files match - analyzing the first {VISION_MAX_IMAGES}")
+                    image_paths = image_paths[:VISION_MAX_IMAGES]
+
+                print(f"\n[IMAGE] Analyzing {len(image_paths)} images with {agent.vision_model}...")
+                done = []
+
+                def show_result(path: str, description: str):
+                    done.append(path)
+                    print(f"  [{len(done)}/{len(image_paths)}] {path}: {description[:100]}")
+
+                response, soul_updated, compacted = agent.chat_with_images(question, image_paths,
+                                                                           on_result=show_result)
+                print("\nAgent: " + response)
+                if compacted:
+                    stats = agent.memory.get_stats()
+                    print(f"\n  (Memory organized: {stats['hot']} active, {stats['archive']} archived)")
+
             else:
                 response, soul_updated, compacted = agent.chat(user_input)
                 print("\nAgent: " + response)
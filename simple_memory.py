@@ -1,29 +1,170 @@
 """Simple JSON-based memory layer (no heavy dependencies)"""
+import hashlib
 import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from config import SOUL_PATH, SOUL_UPDATE_FREQUENCY, MEMORY_DIR
+from typing import List, Dict, Any, Optional, Tuple
+from config import (SOUL_PATH, SOUL_UPDATE_FREQUENCY, MEMORY_DIR, DEFAULT_USER_ID, MEMORY_MAX_OPEN_STORES,
+                    NEAR_DUP_ENABLED, NEAR_DUP_MAX_DISTANCE, NEAR_DUP_TYPES, NEAR_DUP_ACTION)
+from near_dup import SimHashIndex, simhash
+from perf import timed
+
+# Serializes soul writes (the default user's soul.md is shared by its agents)
+_soul_lock = threading.Lock()
+
+MANIFEST_VERSION = 1
+
+
+def partition_dir(user_id: str, memory_dir: Optional[Path] = None) -> Path:
+    """Directory holding a user's memory files"""
+    base = memory_dir or MEMORY_DIR
+    if user_id == DEFAULT_USER_ID:
+        return base
+    # Readable prefix plus a hash of the exact id, so ids that sanitize alike
+    # (or differ only in case) never share a folder
+    slug = re.sub(r'[^a-z0-9_-]', '_', user_id.lower())[:40]
+    digest = hashlib.sha256(user_id.encode('utf-8')).hexdigest()[:16]
+    return base / "users" / f"{slug}-{digest}"
 
 
 class SimpleMemory:
     """Lightweight memory management using JSON"""
 
-    def __init__(self):
+    def __init__(self, user_id: str = DEFAULT_USER_ID, memory_dir: Optional[Path] = None,
+                 soul_path: Optional[Path] = None):
         """Initialize the memory layer"""
-        self.memory_file = MEMORY_DIR / "memories.json"
-        self.archive_file = MEMORY_DIR / "memories_archive.json"
+        self.user_id = user_id
+        self.store_dir = partition_dir(user_id, memory_dir)
+        # Each partition grows its own soul; the default user keeps soul.md
+        self.soul_path = soul_path or (SOUL_PATH if user_id == DEFAULT_USER_ID else self.store_dir / "soul.md")
+        self.memory_file = self.store_dir / "memories.json"
+        self.archive_file = self.store_dir / "memories_archive.json"
+        self.manifest_file = self.store_dir / "manifest.json"
         self.memory_file.parent.mkdir(parents=True, exist_ok=True)
 
-        self.memories = self._load_memories()
+        # Guards writes when one store is shared by concurrent requests
+        self._lock = threading.RLock()
+        self._memories: Optional[List[Dict]] = None  # Lazy load - only when needed
         self.archive = []  # Lazy load - only when needed
         self.archive_loaded = False
-        # Initialize interaction count from existing conversation memories
+
+        # Near-duplicate index over hot memories (built on first insert)
+        self._dup_index: Optional[SimHashIndex] = None
+        self._dup_members: Dict[int, Dict] = {}
+        self.duplicates_suppressed = 0
+
+        # Counts come from the manifest so opening a store doesn't scan it
+        self.interaction_count = 0
+        self.manifest = self._load_manifest() or self._rebuild_manifest()
+        self.interaction_count = self.manifest["interaction_count"]
+
+    @property
+    def memories(self) -> List[Dict]:
+        """Hot memories, loaded from disk on first access"""
+        if self._memories is None:
+            with self._lock:
+                if self._memories is None:
+                    self._memories = self._load_memories()
+                    self._build_indexes()
+        return self._memories
+
+    @memories.setter
+    def memories(self, value: List[Dict]):
+        self._memories = value
+        self._dup_index = None  # Rebuilt from the new list on the next insert
+
+    def _near_dup_index(self) -> SimHashIndex:
+        """LSH index of the hot memories that are checked for duplicates"""
+        if self._dup_index is None:
+            self._dup_index = SimHashIndex(NEAR_DUP_MAX_DISTANCE)
+            self._dup_members = {}
+            for memory in self.memories:
+                self._index_near_dup(memory)
+        return self._dup_index
+
+    def _index_near_dup(self, memory: Dict):
+        """Fingerprint a memory into the index (the fingerprint is stored so restarts don't recompute it)"""
+        if memory.get('type') not in NEAR_DUP_TYPES:
+            return
+        if "simhash" not in memory:
+            memory["simhash"] = format(simhash(memory.get('text', '')), "016x")
+        self._dup_members[id(memory)] = memory
+        self._dup_index.add(id(memory), int(memory["simhash"], 16))
+
+    def _merge_near_duplicate(self, mem_type: str, text: str, category: Optional[str] = None) -> Optional[Dict]:
+        """Existing memory the new one nearly duplicates (merged per NEAR_DUP_ACTION), or None"""
+        if not NEAR_DUP_ENABLED or mem_type not in NEAR_DUP_TYPES:
+            return None
+        for key, _ in self._near_dup_index().query(simhash(text)):
+            existing = self._dup_members[key]
+            if existing.get('type') == mem_type and existing.get('category') == category:
+                if NEAR_DUP_ACTION == "merge":
+                    metadata = existing.setdefault("metadata", {})
+                    metadata["seen_count"] = metadata.get("seen_count", 1) + 1
+                    metadata["last_seen"] = datetime.now().isoformat()
+                self.duplicates_suppressed += 1
+                return existing
+        return None
+
+    @staticmethod
+    def _file_signature(path: Path) -> Optional[List[int]]:
+        """Size and mtime of a file, used to detect edits behind the manifest's back"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _load_manifest(self) -> Optional[Dict[str, Any]]:
+        """Read the manifest, or None if it's missing or out of date"""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (manifest.get("version") != MANIFEST_VERSION
+                or manifest.get("memories_file") != self._file_signature(self.memory_file)
+                or manifest.get("archive_file") != self._file_signature(self.archive_file)):
+            return None
+        return manifest
+
+    def _rebuild_manifest(self) -> Dict[str, Any]:
+        """Recount everything from the store files (first run or after outside edits)"""
+        self.manifest = {"version": MANIFEST_VERSION, "archive": len(self._load_archive())}
         self.interaction_count = sum(1 for m in self.memories if m.get('type') == 'conversation')
-        self.user_id = "default_user"
+        self._recount()
+        self._save_manifest()
+        return self.manifest
 
-        # Build type indexes for faster filtering
-        self._build_indexes()
+    def _recount(self):
+        """Recount the hot memories into the manifest"""
+        self.manifest.update(hot=0, types={"conversation": 0, "fact": 0, "task": 0}, knowledge_areas={})
+        for memory in self.memories:
+            self._track(memory)
+
+    def _track(self, memory: Dict):
+        """Count a new hot memory in the manifest"""
+        mem_type = memory.get('type', 'unknown')
+        self.manifest["hot"] += 1
+        self.manifest["types"][mem_type] = self.manifest["types"].get(mem_type, 0) + 1
+        if mem_type == "fact":
+            category = memory.get('category', 'general')
+            self.manifest["knowledge_areas"][category] = self.manifest["knowledge_areas"].get(category, 0) + 1
+
+    def _save_manifest(self):
+        """Write the manifest atomically, stamped with the current store files"""
+        self.manifest["interaction_count"] = self.interaction_count
+        self.manifest["memories_file"] = self._file_signature(self.memory_file)
+        self.manifest["archive_file"] = self._file_signature(self.archive_file)
+        tmp = self.manifest_file.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self.manifest_file)
 
     def _load_memories(self) -> List[Dict]:
         """Load memories from JSON file"""
@@ -35,10 +176,20 @@ class SimpleMemory:
                 return []
         return []
 
+    @timed("memory.save")
     def _save_memories(self):
         """Save memories to JSON file"""
         with open(self.memory_file, 'w', encoding='utf-8') as f:
             json.dump(self.memories, f, indent=2, ensure_ascii=False)
+        self._save_manifest()
+
+    def flush(self):
+        """Write hot memories and the archive (whichever are loaded) to disk"""
+        with self._lock:
+            if self._memories is not None:
+                self._save_memories()
+            if self.archive_loaded:
+                self._save_archive()
 
     def _load_archive(self) -> List[Dict]:
         """Load archived memories (lazy - only when needed)"""
@@ -54,10 +205,13 @@ class SimpleMemory:
             self.archive_loaded = True
         return self.archive
 
+    @timed("memory.save_archive")
     def _save_archive(self):
         """Save archive to file"""
         with open(self.archive_file, 'w', encoding='utf-8') as f:
             json.dump(self.archive, f, indent=2, ensure_ascii=False)
+        self.manifest["archive"] = len(self.archive)
+        self._save_manifest()
 
     def _build_indexes(self):
         """Build indexes for faster filtering"""
@@ -67,52 +221,83 @@ class SimpleMemory:
 
     def add_conversation(self, user_message: str, agent_response: str, metadata: Optional[Dict] = None) -> str:
         """Store a conversation exchange"""
-        memory = {
-            "id": len(self.memories),
-            "type": "conversation",
-            "user_message": user_message,
-            "agent_response": agent_response,
-            "text": f"User: {user_message}\nAgent: {agent_response}",
-            "timestamp": datetime.now().isoformat(),
-            "metadata": metadata or {}
-        }
-        self.memories.append(memory)
-        self._save_memories()
-        self.interaction_count += 1
-        self._build_indexes()
+        with self._lock:
+            memory = {
+                "id": len(self.memories),
+                "type": "conversation",
+                "user_message": user_message,
+                "agent_response": agent_response,
+                "text": f"User: {user_message}\nAgent: {agent_response}",
+                "timestamp": datetime.now().isoformat(),
+                "metadata": metadata or {}
+            }
+            self.memories.append(memory)
+            self._track(memory)
+            self.interaction_count += 1
+            self._save_memories()
+            self._build_indexes()
         return str(memory["id"])
 
     def add_fact(self, fact: str, category: Optional[str] = None) -> str:
         """Store a learned fact"""
-        memory = {
-            "id": len(self.memories),
-            "type": "fact",
-            "text": fact,
-            "category": category or "general",
-            "timestamp": datetime.now().isoformat(),
-            "metadata": {}
-        }
-        self.memories.append(memory)
-        self._save_memories()
-        self._build_indexes()
-        return str(memory["id"])
+        return self.add_facts([(fact, category)])[0]
+
+    def add_facts(self, facts: List[Tuple[str, Optional[str]]]) -> List[str]:
+        """Store several (fact, category) pairs with a single write"""
+        ids = []
+        changed = False
+        with self._lock:
+            for fact, category in facts:
+                duplicate = self._merge_near_duplicate("fact", fact, category or "general")
+                if duplicate is not None:
+                    ids.append(str(duplicate["id"]))
+                    changed = changed or NEAR_DUP_ACTION == "merge"
+                    continue
+                memory = {
+                    "id": len(self.memories),
+                    "type": "fact",
+                    "text": fact,
+                    "category": category or "general",
+                    "timestamp": datetime.now().isoformat(),
+                    "metadata": {}
+                }
+                self.memories.append(memory)
+                self._track(memory)
+                if self._dup_index is not None:
+                    self._index_near_dup(memory)
+                ids.append(str(memory["id"]))
+                changed = True
+            if changed:
+                self._save_memories()
+                self._build_indexes()
+        return ids
 
     def add_task(self, task: str, status: str = "completed", outcome: Optional[str] = None) -> str:
         """Store a task and its outcome"""
-        memory = {
-            "id": len(self.memories),
-            "type": "task",
-            "text": task,
-            "status": status,
-            "outcome": outcome,
-            "timestamp": datetime.now().isoformat(),
-            "metadata": {}
-        }
-        self.memories.append(memory)
-        self._save_memories()
-        self._build_indexes()
+        with self._lock:
+            duplicate = self._merge_near_duplicate("task", task)
+            if duplicate is not None:
+                if NEAR_DUP_ACTION == "merge":
+                    self._save_memories()
+                return str(duplicate["id"])
+            memory = {
+                "id": len(self.memories),
+                "type": "task",
+                "text": task,
+                "status": status,
+                "outcome": outcome,
+                "timestamp": datetime.now().isoformat(),
+                "metadata": {}
+            }
+            self.memories.append(memory)
+            self._track(memory)
+            if self._dup_index is not None:
+                self._index_near_dup(memory)
+            self._save_memories()
+            self._build_indexes()
         return str(memory["id"])
 
+    @timed("memory.search")
     def search_memory(self, query: str, limit: int = 5, memory_type: Optional[str] = None,
                      include_archive: bool = False) -> List[Dict]:
         """Search through memories with optional archive inclusion"""
@@ -167,12 +352,11 @@ class SimpleMemory:
         return self.memories
 
     def get_stats(self) -> Dict[str, int]:
-        """Get memory statistics including archive"""
-        self._load_archive()
+        """Get memory statistics including archive (from the manifest, nothing is loaded)"""
         return {
-            "hot": len(self.memories),
-            "archive": len(self.archive),
-            "total": len(self.memories) + len(self.archive)
+            "hot": self.manifest["hot"],
+            "archive": self.manifest["archive"],
+            "total": self.manifest["hot"] + self.manifest["archive"]
         }
 
     def get_context_for_query(self, query: str, max_results: int = 8) -> str:
@@ -222,37 +406,27 @@ class SimpleMemory:
 
     def analyze_memories_for_soul(self) -> Dict[str, Any]:
         """Analyze memories to extract insights for soul.md"""
-        analysis = {
-            "total_memories": len(self.memories),
-            "conversations": 0,
-            "facts": 0,
-            "tasks": 0,
+        # Hot-store counts are kept in the manifest, so this needs no scan
+        types = self.manifest["types"]
+        return {
+            "total_memories": self.manifest["hot"],
+            "conversations": types.get("conversation", 0),
+            "facts": types.get("fact", 0),
+            "tasks": types.get("task", 0),
             "personality_insights": [],
-            "knowledge_areas": {},
+            "knowledge_areas": dict(self.manifest["knowledge_areas"]),
             "interaction_patterns": []
         }
 
-        for memory in self.memories:
-            mem_type = memory.get('type', 'unknown')
-
-            if mem_type == "conversation":
-                analysis["conversations"] += 1
-            elif mem_type == "fact":
-                analysis["facts"] += 1
-                category = memory.get('category', 'general')
-                analysis["knowledge_areas"][category] = analysis["knowledge_areas"].get(category, 0) + 1
-            elif mem_type == "task":
-                analysis["tasks"] += 1
-
-        return analysis
-
     def update_soul_if_needed(self, force: bool = False) -> bool:
         """Update soul.md if enough interactions have occurred"""
         if force or self.interaction_count % SOUL_UPDATE_FREQUENCY == 0:
-            self._update_soul()
+            with _soul_lock:
+                self._update_soul()
             return True
         return False
 
+    @timed("memory.compact")
     def compact_memories(self, force: bool = False) -> Dict[str, int]:
         """
         Compact memories by moving old conversations/tasks to archive.
@@ -265,54 +439,55 @@ class SimpleMemory:
         """
         from config import COMPACTION_THRESHOLD, COMPACTION_KEEP_HOT, COMPACTION_KEEP_TASKS
 
-        # Check if compaction needed
-        total_hot = len(self.memories)
-        if not force and total_hot < COMPACTION_THRESHOLD:
-            self._load_archive()  # Ensure archive is loaded for stats
-            return {"moved": 0, "hot": total_hot, "archive": len(self.archive)}
+        with self._lock:
+            # Check if compaction needed
+            total_hot = self.manifest["hot"]
+            if not force and total_hot < COMPACTION_THRESHOLD:
+                return {"moved": 0, "hot": total_hot, "archive": self.manifest["archive"]}
 
-        # Ensure archive is loaded
-        self._load_archive()
+            # Ensure archive is loaded
+            self._load_archive()
 
-        # Separate facts (keep all) from conversations/tasks
-        facts = [m for m in self.memories if m.get('type') == 'fact']
-        conversations = [m for m in self.memories if m.get('type') == 'conversation']
-        tasks = [m for m in self.memories if m.get('type') == 'task']
+            # Separate facts (keep all) from conversations/tasks
+            facts = [m for m in self.memories if m.get('type') == 'fact']
+            conversations = [m for m in self.memories if m.get('type') == 'conversation']
+            tasks = [m for m in self.memories if m.get('type') == 'task']
 
-        # Sort by timestamp (oldest first)
-        conversations.sort(key=lambda x: x.get('timestamp', ''))
-        tasks.sort(key=lambda x: x.get('timestamp', ''))
+            # Sort by timestamp (oldest first)
+            conversations.sort(key=lambda x: x.get('timestamp', ''))
+            tasks.sort(key=lambda x: x.get('timestamp', ''))
 
-        # Determine what to move to archive
-        keep_conversations = conversations[-COMPACTION_KEEP_HOT:] if len(conversations) > COMPACTION_KEEP_HOT else conversations
-        move_conversations = conversations[:-COMPACTION_KEEP_HOT] if len(conversations) > COMPACTION_KEEP_HOT else []
+            # Determine what to move to archive
+            keep_conversations = conversations[-COMPACTION_KEEP_HOT:] if len(conversations) > COMPACTION_KEEP_HOT else conversations
+            move_conversations = conversations[:-COMPACTION_KEEP_HOT] if len(conversations) > COMPACTION_KEEP_HOT else []
 
-        keep_tasks = tasks[-COMPACTION_KEEP_TASKS:] if len(tasks) > COMPACTION_KEEP_TASKS else tasks
-        move_tasks = tasks[:-COMPACTION_KEEP_TASKS] if len(tasks) > COMPACTION_KEEP_TASKS else []
+            keep_tasks = tasks[-COMPACTION_KEEP_TASKS:] if len(tasks) > COMPACTION_KEEP_TASKS else tasks
+            move_tasks = tasks[:-COMPACTION_KEEP_TASKS] if len(tasks) > COMPACTION_KEEP_TASKS else []
 
-        # Add to archive
-        self.archive.extend(move_conversations)
-        self.archive.extend(move_tasks)
+            # Add to archive
+            self.archive.extend(move_conversations)
+            self.archive.extend(move_tasks)
 
-        # Rebuild hot storage
-        self.memories = facts + keep_conversations + keep_tasks
+            # Rebuild hot storage
+            self.memories = facts + keep_conversations + keep_tasks
 
-        # Reassign IDs
-        for i, mem in enumerate(self.memories):
-            mem['id'] = i
+            # Reassign IDs
+            for i, mem in enumerate(self.memories):
+                mem['id'] = i
+            self._recount()
 
-        # Save both files
-        self._save_memories()
-        self._save_archive()
+            # Save both files
+            self._save_memories()
+            self._save_archive()
 
-        # Rebuild indexes
-        self._build_indexes()
+            # Rebuild indexes
+            self._build_indexes()
 
-        return {
-            "moved": len(move_conversations) + len(move_tasks),
-            "hot": len(self.memories),
-            "archive": len(self.archive)
-        }
+            return {
+                "moved": len(move_conversations) + len(move_tasks),
+                "hot": len(self.memories),
+                "archive": len(self.archive)
+            }
 
     def _check_auto_compact(self) -> bool:
         """Check if auto-compaction should trigger"""
@@ -321,21 +496,20 @@ class SimpleMemory:
         if not AUTO_COMPACT_ENABLED:
             return False
 
-        total_hot = len(self.memories)
+        total_hot = self.manifest["hot"]
         if total_hot >= COMPACTION_THRESHOLD:
             self.compact_memories()
             return True
         return False
 
+    @timed("memory.soul_write")
     def _update_soul(self):
         """Update the soul.md file with current insights"""
         analysis = self.analyze_memories_for_soul()
 
         # Read current soul
-        if SOUL_PATH.exists():
-            with open(SOUL_PATH, 'r', encoding='utf-8') as f:
-                soul_content = f.read()
-        else:
+        soul_content = self.load_soul()
+        if soul_content is None:
             return
 
         # Update statistics
@@ -396,5 +570,115 @@ class SimpleMemory:
                 )
 
         # Write updated soul
-        with open(SOUL_PATH, 'w', encoding='utf-8') as f:
+        with open(self.soul_path, 'w', encoding='utf-8') as f:
             f.write(soul_content)
+
+    def load_soul(self) -> Optional[str]:
+        """This store's soul, starting a new partition's from soul.md (None if there's none)"""
+        if self.soul_path.exists():
+            with open(self.soul_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        if self.soul_path == SOUL_PATH or not SOUL_PATH.exists():
+            return None
+
+        # Keep the shared personality but none of the default user's knowledge, counts or milestones
+        with open(SOUL_PATH, 'r', encoding='utf-8') as f:
+            soul_content = f.read()
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        soul_content = re.sub(r'\*\*Created\*\*: .*', f'**Created**: {timestamp}', soul_content)
+        soul_content = re.sub(r'\*\*Total Interactions\*\*: \d+', '**Total Interactions**: 0', soul_content)
+        soul_content = re.sub(r'### Learned Knowledge\n.*?(?=\n---|\n## |$)',
+                              '### Learned Knowledge\n*Knowledge grows through conversations*\n',
+                              soul_content, flags=re.DOTALL)
+        soul_content = re.sub(r'## Memory Statistics.*?(?=\n---|\n## |$)', '## Memory Statistics\n\n',
+                              soul_content, flags=re.DOTALL)
+        return re.sub(r'- \*\*[^*]+\*\*: Reached \d+ total memories.*\n?', '', soul_content)
+
+
+class MemoryManager:
+    """Opens per-user memory stores on demand and keeps the most recently used in RAM"""
+
+    def __init__(self, max_open: int = MEMORY_MAX_OPEN_STORES, memory_dir: Optional[Path] = None):
+        """Initialize the manager"""
+        self.max_open = max_open
+        self.memory_dir = memory_dir
+        self._stores: "OrderedDict[str, SimpleMemory]" = OrderedDict()
+        self._in_use: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.evicted = 0
+        self.hits = 0
+
+    def get(self, user_id: str = DEFAULT_USER_ID) -> SimpleMemory:
+        """Return the store for a user, opening it if needed"""
+        with self._lock:
+            memory = self._stores.get(user_id)
+            if memory is not None:
+                self._stores.move_to_end(user_id)
+                self.hits += 1
+                return memory
+
+            memory = SimpleMemory(user_id, self.memory_dir)
+            self._stores[user_id] = memory
+            self.opened += 1
+            self._evict_over_limit()
+            return memory
+
+    @contextmanager
+    def session(self, user_id: str = DEFAULT_USER_ID):
+        """Use a user's store, pinning it so it is not evicted mid-request"""
+        with self._lock:
+            self._in_use[user_id] = self._in_use.get(user_id, 0) + 1
+        try:
+            yield self.get(user_id)
+        finally:
+            with self._lock:
+                self._in_use[user_id] -= 1
+                if not self._in_use[user_id]:
+                    del self._in_use[user_id]
+                self._evict_over_limit()
+
+    def _evict_over_limit(self):
+        """Flush and drop least recently used stores (caller holds the lock)"""
+        if len(self._stores) <= self.max_open:
+            return
+        for user_id in list(self._stores):
+            if len(self._stores) <= self.max_open:
+                break
+            if user_id in self._in_use:
+                continue  # Pinned stores may push us over the limit temporarily
+            self._stores.pop(user_id).flush()
+            self.evicted += 1
+
+    def evict(self, user_id: str) -> bool:
+        """Flush and close a single user's store"""
+        with self._lock:
+            if user_id not in self._stores or user_id in self._in_use:
+                return False
+            self._stores.pop(user_id).flush()
+            self.evicted += 1
+            return True
+
+    def flush_all(self):
+        """Flush every open store (e.g. on shutdown)"""
+        with self._lock:
+            for memory in self._stores.values():
+                memory.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get manager statistics"""
+        with self._lock:
+            return {
+                "open": len(self._stores),
+                "max_open": self.max_open,
+                "in_use": len(self._in_use),
+                "opened": self.opened,
+                "evicted": self.evicted,
+                "hits": self.hits
+            }
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._stores
+
+    def __len__(self) -> int:
+        return len(self._stores)
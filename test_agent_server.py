@@ -0,0 +1,86 @@
+"""Test the HTTP serving mode (no Ollama needed - exercises memory endpoints)"""
+import asyncio
+import json
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from agent_server import AgentServer
+from simple_memory import MemoryManager, partition_dir
+
+
+def _request(port: int, path: str, payload=None):
+    """Blocking HTTP call returning (status, json)"""
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data,
+                                 headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+async def _exercise_server(tmp: Path):
+    server = AgentServer(port=0, concurrency=1, queue_size=1,
+                         memories=MemoryManager(memory_dir=tmp))
+    await server.start()
+    port = server.port
+
+    status, body = await asyncio.to_thread(_request, port, "/learn",
+                                           {"fact": "Alice likes tea", "user_id": "alice"})
+    print(f"  /learn -> {status} {body['message']}")
+    assert status == 200
+    assert (partition_dir("alice", tmp) / "memories.json").exists()
+
+    status, body = await asyncio.to_thread(_request, port, "/search",
+                                           {"query": "tea", "user_id": "alice"})
+    print(f"  /search -> {status} ({body['count']} results)")
+    assert status == 200 and body["count"] == 1
+
+    status, body = await asyncio.to_thread(_request, port, "/stats?user_id=alice")
+    print(f"  /stats -> {status} facts={body['facts']} server={body['server']}")
+    assert status == 200 and body["facts"] == 1
+
+    status, _ = await asyncio.to_thread(_request, port, "/learn", {"category": "x"})
+    assert status == 400
+    status, _ = await asyncio.to_thread(_request, port, "/nope", {})
+    assert status == 404
+
+    # Saturate: one worker and a one-slot queue, so some requests must get 429
+    server.routes["/slow"] = lambda payload: time.sleep(0.5) or {"ok": True}
+    results = await asyncio.gather(*[
+        asyncio.to_thread(_request, port, "/slow", {}) for _ in range(5)
+    ])
+    statuses = sorted(status for status, _ in results)
+    print(f"  Saturated statuses: {statuses}")
+    assert 200 in statuses and 429 in statuses
+
+    # /stats reads the store too, so it queues behind the same workers
+    release = threading.Event()
+    server.routes["/hold"] = lambda payload: release.wait(10) and {"ok": True}
+    held = []
+    for ready in (lambda: server.busy == 1, server.queue.full):   # One running, then one waiting
+        held.append(asyncio.create_task(asyncio.to_thread(_request, port, "/hold", {})))
+        while not ready():
+            await asyncio.sleep(0.01)
+    status, _ = await asyncio.to_thread(_request, port, "/stats?user_id=alice")
+    print(f"  /stats while saturated -> {status}")
+    release.set()
+    await asyncio.gather(*held)
+    assert status == 429
+
+    await server.stop()
+
+
+def test_agent_server():
+    print("[TEST] Testing HTTP server mode\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(_exercise_server(Path(tmp)))
+    print("\n[SUCCESS] Server endpoints and backpressure working!")
+
+
+if __name__ == "__main__":
+    test_agent_server()
@@ -0,0 +1,42 @@
+"""Test batched chat with a bounded worker pool"""
+import tempfile
+from pathlib import Path
+from llm_client import LLMClient
+from simple_agent import SimpleAgent
+from simple_memory import SimpleMemory
+from test_llm_client import StandInOllama
+
+
+def test_chat_batch():
+    print("[TEST] Testing chat_batch\n")
+
+    prompts = [f"prompt {i}" for i in range(6)]
+    # Earlier prompts take longest, so answers finish in roughly reverse order
+    standin = StandInOllama(delay=lambda request: 0.05 * (6 - int(request["messages"][-1]["content"].split()[-1])))
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            agent = SimpleAgent(model="m", memory=SimpleMemory("batch", memory_dir=Path(tmp)),
+                                llm=LLMClient([standin.url]))
+            agent.show_thinking = False
+            responses, stats = agent.chat_batch(prompts, concurrency=2)
+
+            print(f"  Stats: {stats}")
+            print(f"  Most requests at once: {standin.max_active}")
+            assert responses == [f"echo {p}" for p in prompts]
+            assert standin.max_active == 2 and stats["concurrency"] == 2
+            assert stats["prompts"] == 6 and stats["errors"] == 0 and stats["prompts_per_sec"] > 0
+
+            # Written to memory in prompt order; the interactive history is left alone
+            saved = [m for m in agent.memory.memories if m["type"] == "conversation"]
+            assert [m["user_message"] for m in saved] == prompts
+            assert [m["agent_response"] for m in saved] == responses
+            assert all(m["metadata"]["batch"] for m in saved)
+            assert not agent.conversation_history
+        finally:
+            standin.close()
+
+    print("\n[SUCCESS] Batches run in parallel and persist in order!")
+
+
+if __name__ == "__main__":
+    test_chat_batch()
@@ -0,0 +1,143 @@
+"""Test the rolling conversation summary"""
+import contextlib
+import io
+import tempfile
+import time
+from pathlib import Path
+from config import HISTORY_WINDOW, HISTORY_SUMMARY_BATCH, HISTORY_SUMMARY_MAX_PENDING
+from llm_client import LLMClient
+from simple_agent import SimpleAgent
+from simple_memory import SimpleMemory
+from test_llm_client import StandInOllama
+
+
+def _agent(standin, base):
+    agent = SimpleAgent(model="m", memory=SimpleMemory("summary", memory_dir=base),
+                        llm=LLMClient([standin.url]))
+    agent.show_thinking = False
+    return agent
+
+
+def _fill(agent, turns, start=0):
+    """Append turns without calling the model; the summarizer starts on rollover"""
+    for i in range(start, start + turns):
+        agent._append_history(f"question {i}", f"answer {i}")
+
+
+def _wait_idle(agent, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while agent._summary_running and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not agent._summary_running
+
+
+def test_history_rollover():
+    print("[TEST] Testing history rollover into the summary\n")
+
+    standin = StandInOllama()
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            agent = _agent(standin, Path(tmp))
+            _fill(agent, 9)   # The 9th turn overflows the window and evicts the oldest messages
+            _wait_idle(agent)
+
+            print(f"  Kept {len(agent.conversation_history)} messages, summary: {agent.history_summary[:60]!r}...")
+            assert len(agent.conversation_history) == HISTORY_WINDOW
+            assert "question 0" in agent.history_summary and "question 4" not in agent.history_summary
+            assert len(standin.chat_requests) == 1 and standin.chat_requests[0]["options"]["num_predict"] == 300
+
+            # The summary goes into the prompt ahead of the verbatim window
+            messages = agent._build_messages("next", include_context=False)
+            assert "SUMMARY OF EARLIER CONVERSATION" in messages[1]["content"]
+        finally:
+            standin.close()
+
+    print("\n[SUCCESS] Older turns are folded into the summary!")
+
+
+def test_clear_during_summary():
+    print("[TEST] Testing /clear while a summary is being written\n")
+
+    standin = StandInOllama(delay=0.4)
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            agent = _agent(standin, Path(tmp))
+            _fill(agent, 9)
+            time.sleep(0.1)   # Summarizer is now waiting on the model
+            assert agent._summary_running
+            agent.clear_history()
+            _wait_idle(agent)
+
+            print(f"  Summary after clear: {agent.history_summary!r}")
+            assert agent.history_summary == "" and not agent.conversation_history
+        finally:
+            standin.close()
+
+    print("\n[SUCCESS] A cleared conversation's summary doesn't come back!")
+
+
+def test_summary_error_keeps_batch():
+    print("[TEST] Testing summarization errors\n")
+
+    standin = StandInOllama(models=())   # Model missing: every summary call fails
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            agent = _agent(standin, Path(tmp))
+            _fill(agent, 9)
+            _wait_idle(agent)
+            print(f"  Pending after failure: {len(agent._summary_pending)} messages")
+            assert agent.history_summary == "" and len(agent._summary_pending) == 8
+
+            # Next rollover retries the failed batch first, then the new one
+            standin.models = ["m:latest"]
+            before = len(standin.chat_requests)
+            _fill(agent, 4, start=9)
+            _wait_idle(agent)
+            retried = [r["messages"][-1]["content"] for r in standin.chat_requests[before:]]
+            print(f"  Summary: {agent.history_summary[:60]!r}... after {len(retried)} calls")
+            assert agent.history_summary and not agent._summary_pending
+            assert len(retried) == 2 and "question 0" in retried[0] and "question 7" in retried[1]
+        finally:
+            standin.close()
+
+    print("\n[SUCCESS] Failed summaries are retried, not dropped!")
+
+
+def test_summary_backlog_is_bounded():
+    print("[TEST] Testing the summary queue while the model is down\n")
+
+    standin = StandInOllama(models=())
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            agent = _agent(standin, Path(tmp))
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                for start in range(0, 200, 4):
+                    _fill(agent, 4, start=start)
+                    _wait_idle(agent)
+            print(f"  Pending after 200 turns: {len(agent._summary_pending)} messages")
+            assert len(agent._summary_pending) <= HISTORY_SUMMARY_MAX_PENDING
+            assert "dropped 8 old messages" in output.getvalue()
+
+            # Recovery works through the backlog one rollover at a time, newest turns kept
+            standin.models = ["m:latest"]
+            before = len(standin.chat_requests)
+            _fill(agent, 4, start=200)
+            _wait_idle(agent)
+            prompts = [r["messages"][-1]["content"] for r in standin.chat_requests[before:]]
+            print(f"  Recovered in {len(prompts)} calls, longest prompt {max(map(len, prompts))} chars")
+            assert not agent._summary_pending and "question 203" not in agent.history_summary
+            transcripts = [p.rsplit("New exchanges to fold in:", 1)[1].split("Write a concise")[0] for p in prompts]
+            assert all(t.count("User: ") <= (HISTORY_SUMMARY_BATCH + 2) // 2 for t in transcripts)
+            assert "question 0\n" not in "".join(transcripts) and "question 195" in transcripts[-1]
+        finally:
+            standin.close()
+
+    print("\n[SUCCESS] The summary backlog stays bounded!")
+
+
+if __name__ == "__main__":
+    test_history_rollover()
+    test_clear_during_summary()
+    test_summary_error_keeps_batch()
+    test_summary_backlog_is_bounded()
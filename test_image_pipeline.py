@@ -0,0 +1,84 @@
+"""Test image preprocessing before vision inference"""
+import io
+import os
+import tempfile
+from pathlib import Path
+import image_pipeline
+from config import VISION_PREPROCESS_CACHE_MAX
+from image_pipeline import prepare_image
+
+
+def test_prepare_image():
+    print("[TEST] Testing image preprocessing\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+
+        # Files Pillow can't decode (or any file without Pillow) are sent as-is
+        junk = base / "junk.png"
+        junk.write_bytes(b"not really an image")
+        prepared = prepare_image(junk, "moondream", cache_dir=base / "cache")
+        assert prepared["data"] == b"not really an image" and prepared["size"] is None
+
+        try:
+            from PIL import Image
+        except ImportError:
+            print("  Pillow not installed - skipping resize checks")
+            return
+
+        photo = base / "photo.jpg"
+        exif = Image.Exif()
+        exif[0x010F] = "PhoneMaker"   # Make
+        exif[0x0112] = 6              # Orientation: rotated 90 degrees
+        Image.new("RGB", (4000, 3000), (200, 80, 40)).save(photo, quality=95, exif=exif)
+
+        prepared = prepare_image(photo, "moondream:latest", cache_dir=base / "cache")
+        print(f"  {prepared['original_size']} -> {prepared['size']}, "
+              f"{prepared['original_bytes']} -> {prepared['bytes']} bytes, {prepared['timings']}")
+        assert prepared["original_size"] == (4000, 3000)
+        width, height = prepared["size"]
+        assert height == 378 and width < height        # Upright and at moondream's input size
+        assert prepared["bytes"] < prepared["original_bytes"]
+        assert set(prepared["timings"]) == {"read", "decode", "resize", "encode"}
+        assert not Image.open(io.BytesIO(prepared["data"])).getexif()
+
+        # Second call reads the preprocessed bytes from the cache
+        again = prepare_image(photo, "moondream:latest", cache_dir=base / "cache")
+        assert again["cached"] and again["data"] == prepared["data"]
+
+        # Larger-input models get a larger image
+        assert max(prepare_image(photo, "llava", cache_dir=None)["size"]) == 672
+
+        # Transparent areas end up white, not black
+        logo = base / "logo.png"
+        transparent = Image.new("RGBA", (200, 100), (0, 0, 0, 0))
+        transparent.paste((0, 0, 255, 255), (0, 0, 100, 100))
+        transparent.save(logo)
+        flat = Image.open(io.BytesIO(prepare_image(logo, "moondream", cache_dir=None)["data"]))
+        print(f"  Transparent pixel -> {flat.getpixel((150, 50))}, opaque -> {flat.getpixel((50, 50))}")
+        assert min(flat.getpixel((150, 50))) > 240 and flat.getpixel((50, 50))[2] > 200
+
+        # The cache evicts the least recently used image, not the oldest written
+        cache = base / "lru"
+        shots = []
+        for i, color in enumerate(((255, 0, 0), (0, 255, 0), (0, 0, 255))):
+            shots.append(base / f"shot{i}.png")
+            Image.new("RGB", (64, 64), color).save(shots[-1])
+        image_pipeline.VISION_PREPROCESS_CACHE_MAX = 2
+        try:
+            first, second = (prepare_image(shot, "moondream", cache_dir=cache) for shot in shots[:2])
+            cached = {prepared["digest"]: next(cache.glob(prepared["digest"][:32] + "*"))
+                      for prepared in (first, second)}
+            os.utime(cached[first["digest"]], (1000, 1000))    # Written first...
+            os.utime(cached[second["digest"]], (2000, 2000))
+            assert prepare_image(shots[0], "moondream", cache_dir=cache)["cached"]   # ...but used last
+            prepare_image(shots[2], "moondream", cache_dir=cache)
+        finally:
+            image_pipeline.VISION_PREPROCESS_CACHE_MAX = VISION_PREPROCESS_CACHE_MAX
+        assert cached[first["digest"]].exists() and not cached[second["digest"]].exists()
+
+    print("\n[SUCCESS] Images are downscaled, stripped and cached!")
+
+
+if __name__ == "__main__":
+    test_prepare_image()
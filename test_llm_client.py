@@ -0,0 +1,379 @@
+"""Test the LLM client layer against local stand-in Ollama servers"""
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import llm_client
+from config import GENERATION_PROFILES
+from llm_client import LLMClient, ResponseCache, CancelToken, LLMCancelled, LLMTimeout
+
+
+class StandInOllama:
+    """Minimal HTTP server speaking enough of the Ollama API for the client"""
+
+    def __init__(self, models=("m:latest",), delay=0.0, hang: bool = False):
+        self.models = list(models)
+        self.delay = delay  # Seconds, or a function of the request
+        self.hang = hang    # Never answer chat requests; count clients that hang up instead
+        self.disconnects = 0
+        self.chat_requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, request):
+                words = f"echo {request['messages'][-1]['content']}".split(" ")
+                chunks = [{"model": request["model"], "created_at": "2026-01-01T00:00:00Z",
+                           "message": {"role": "assistant", "content": (" " if i else "") + word},
+                           "done": False} for i, word in enumerate(words)]
+                chunks.append({"model": request["model"], "created_at": "2026-01-01T00:00:00Z",
+                               "message": {"role": "assistant", "content": ""},
+                               "done": True, "eval_count": len(words), "eval_duration": 50_000_000,
+                               "prompt_eval_count": 20, "prompt_eval_duration": 10_000_000,
+                               "load_duration": 0, "total_duration": 60_000_000})
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.end_headers()
+                    for chunk in chunks:
+                        self.wfile.write(json.dumps(chunk).encode() + b"\n")
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client aborted the stream
+
+            def do_GET(self):
+                if self.path in ("/api/ps", "/api/tags"):
+                    self._send_json({"models": [{"model": m, "name": m} for m in standin.models]})
+                else:
+                    self._send_json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                standin.chat_requests.append(request)
+                model = request["model"] if ":" in request["model"] else request["model"] + ":latest"
+                if model not in standin.models:
+                    self._send_json({"error": f"model '{request['model']}' not found"}, 404)
+                    return
+                if standin.hang:
+                    # No headers, no first chunk: wait for the client to close the connection
+                    self.connection.settimeout(30)
+                    if self.connection.recv(1) == b"":
+                        standin.disconnects += 1
+                    self.close_connection = True
+                    return
+                with standin._lock:
+                    standin.active += 1
+                    standin.max_active = max(standin.max_active, standin.active)
+                try:
+                    time.sleep(standin.delay(request) if callable(standin.delay) else standin.delay)
+                    if request.get("stream"):
+                        self._stream(request)
+                        return
+                    self._send_json({
+                        "model": request["model"],
+                        "created_at": "2026-01-01T00:00:00Z",
+                        "message": {"role": "assistant",
+                                    "content": f"echo {request['messages'][-1]['content']}"},
+                        "done": True,
+                    })
+                finally:
+                    with standin._lock:
+                        standin.active -= 1
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _ask(client, content, model="m", **kwargs):
+    return client.chat(model, [{"role": "user", "content": content}], **kwargs)
+
+
+def test_singleflight():
+    print("[TEST] Testing request coalescing\n")
+
+    standin = StandInOllama(delay=0.2)
+    try:
+        client = LLMClient([standin.url])
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(_ask(client, "same prompt")))
+                   for _ in range(5)]
+        threads.append(threading.Thread(target=lambda: results.append(_ask(client, "other prompt"))))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = client.get_stats()
+        print(f"  Backend calls: {len(standin.chat_requests)}")
+        print(f"  Requests: {stats['requests']}, coalesced: {stats['coalesced']}")
+        assert len(standin.chat_requests) == 2
+        assert stats["requests"] == 6 and stats["coalesced"] == 4 and stats["inflight"] == 0
+        assert sum(r["message"]["content"] == "echo same prompt" for r in results) == 5
+
+        # Sequential identical calls are not coalesced
+        _ask(client, "same prompt")
+        assert len(standin.chat_requests) == 3
+    finally:
+        standin.close()
+
+    print("\n[SUCCESS] Identical in-flight requests share one generation!")
+
+
+def test_generation_profiles():
+    print("[TEST] Testing per-call-type generation profiles\n")
+
+    standin = StandInOllama()
+    try:
+        client = LLMClient([standin.url])
+        _ask(client, "hello")
+        assert standin.chat_requests[-1]["options"]["num_predict"] == GENERATION_PROFILES["chat"]["num_predict"]
+
+        # Explicit options win over the profile
+        _ask(client, "reply", call_type="network_reply", options={"temperature": 0})
+        sent = standin.chat_requests[-1]["options"]
+        print(f"  network_reply options: {sent}")
+        assert sent["stop"] == GENERATION_PROFILES["network_reply"]["stop"] and sent["temperature"] == 0
+    finally:
+        standin.close()
+
+    print("\n[SUCCESS] Each call type gets its profile!")
+
+
+def test_server_timings():
+    print("[TEST] Testing server-side timings per call\n")
+
+    standin = StandInOllama()
+    try:
+        client = LLMClient([standin.url])
+        for i in range(3):
+            _ask(client, f"prompt {i}")
+        _ask(client, "summarize this", call_type="summarize")
+
+        # Kept per model and call type
+        perf = client.perf.summary()["m / chat"]
+        print(f"  Perf: {perf}")
+        assert perf["calls"] == 3 and perf["decode_tokens_per_sec"] == 60.0 and perf["bound"] == "decode-bound"
+        assert client.perf.summary()["m / summarize"]["calls"] == 1
+    finally:
+        standin.close()
+
+    print("\n[SUCCESS] Ollama timings are recorded per call type!")
+
+
+def test_stop_when():
+    print("[TEST] Testing early stop while streaming\n")
+
+    standin = StandInOllama()
+    try:
+        client = LLMClient([standin.url])
+        response = _ask(client, "one two three four", stop_when=lambda text: len(text.split()) >= 2)
+        print(f"  Stopped early: {response['message']['content']!r}")
+        assert response["message"]["content"] == "echo one"
+        assert response["done_reason"] == "stop_when" and client.get_stats()["stopped_early"] == 1
+
+        # A stop_when that never fires returns the whole reply
+        response = _ask(client, "one two", stop_when=lambda text: False)
+        assert response["message"]["content"] == "echo one two" and client.get_stats()["stopped_early"] == 1
+    finally:
+        standin.close()
+
+    print("\n[SUCCESS] stop_when ends generation early!")
+
+
+def test_response_cache():
+    print("[TEST] Testing persistent response cache\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(tmp, max_entries=2, ttl=60)
+        cache.put("a", {"v": 1})
+        cache.put("b", {"v": 2})
+        assert cache.get("a") == {"v": 1}   # "a" becomes most recent
+        cache.put("c", {"v": 3})             # evicts "b"
+        assert cache.get("b") is None
+
+        # Entries survive a restart, expired ones are dropped
+        reopened = ResponseCache(tmp, max_entries=2, ttl=60)
+        assert reopened.get("c") == {"v": 3}
+        assert ResponseCache(tmp, max_entries=2, ttl=-1).get("c") is None
+        print(f"  Stats: {cache.get_stats()}")
+
+        # Client only caches call types that are switched on
+        standin = StandInOllama()
+        llm_client.LLM_CACHE_CALL_TYPES["vision"] = True
+        try:
+            client = LLMClient([standin.url], cache=ResponseCache(tmp, max_entries=10, ttl=60))
+            first = _ask(client, "describe", call_type="vision")
+            second = _ask(client, "describe", call_type="vision")
+            _ask(client, "describe", call_type="chat")
+            _ask(client, "describe", call_type="chat")
+            print(f"  Backend calls: {len(standin.chat_requests)}")
+            assert "_cached" not in first and second["_cached"] is True
+            assert len(standin.chat_requests) == 3 and client.get_stats()["cache_hits"] == 1
+        finally:
+            standin.close()
+            llm_client.LLM_CACHE_CALL_TYPES["vision"] = False
+
+    print("\n[SUCCESS] Response cache evicts, expires and persists!")
+
+
+def test_load_balancing():
+    print("[TEST] Testing load balancing and failover\n")
+
+    fast = StandInOllama(models=["m:latest"], delay=0.3)
+    other = StandInOllama(models=["m:latest", "vision:latest"], delay=0.3)
+    try:
+        client = LLMClient([fast.url, other.url])
+        client.pool.check_all()
+
+        # Least-outstanding: concurrent distinct requests spread over both servers
+        threads = [threading.Thread(target=_ask, args=(client, f"q{i}")) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        print(f"  Spread: {len(fast.chat_requests)} / {len(other.chat_requests)}")
+        assert len(fast.chat_requests) == 2 and len(other.chat_requests) == 2
+
+        # Model affinity: only one server has the vision model
+        _ask(client, "look", model="vision")
+        assert other.chat_requests[-1]["model"] == "vision"
+        assert all(r["model"] == "m" for r in fast.chat_requests)
+
+        # Failover: a dead server is skipped and the request retried elsewhere
+        fast.close()
+        for i in range(3):
+            assert _ask(client, f"after{i}")["message"]["content"] == f"echo after{i}"
+        stats = client.get_stats()
+        print(f"  Failovers: {stats['failovers']}")
+        print(f"  Endpoints: {[(e['url'], e['healthy']) for e in stats['endpoints']]}")
+        assert stats["failovers"] >= 1 and not stats["endpoints"][0]["healthy"]
+    finally:
+        other.close()
+
+    print("\n[SUCCESS] Requests balance across endpoints and fail over!")
+
+
+def test_deadlines_and_hedging():
+    print("[TEST] Testing deadlines, cancellation and hedging\n")
+
+    slow = StandInOllama(delay=1.0)
+    fast = StandInOllama()
+    try:
+        # A stuck server can't hang the caller past its deadline
+        client = LLMClient([slow.url])
+        started = time.monotonic()
+        try:
+            _ask(client, "hello", timeout=0.3)
+            assert False, "expected LLMTimeout"
+        except LLMTimeout:
+            pass
+        print(f"  Timed out after {time.monotonic() - started:.2f}s")
+        assert time.monotonic() - started < 0.8
+
+        # Cancelling the token aborts the call
+        token = CancelToken()
+        threading.Timer(0.2, token.cancel).start()
+        try:
+            _ask(client, "hello again", cancel=token)
+            assert False, "expected LLMCancelled"
+        except LLMCancelled:
+            pass
+        stats = client.get_stats()
+        assert stats["timeouts"] == 1 and stats["cancelled"] == 1
+
+        # A call slower than p95 is duplicated and the fast reply wins
+        llm_client.LLM_HEDGE_ENABLED = True
+        client = LLMClient([slow.url, fast.url])
+        client._latencies["m:latest"] = llm_client.deque([0.05] * 20)
+        started = time.monotonic()
+        response = _ask(client, "race")
+        elapsed = time.monotonic() - started
+        print(f"  Hedged reply in {elapsed:.2f}s: {response['message']['content']}")
+        assert response["message"]["content"] == "echo race"
+        assert client.get_stats()["hedged"] == 1 and elapsed < 0.8
+        assert len(slow.chat_requests) == 3 and len(fast.chat_requests) == 1
+    finally:
+        llm_client.LLM_HEDGE_ENABLED = False
+        slow.close()
+        fast.close()
+
+    print("\n[SUCCESS] Calls respect deadlines, cancel cleanly and hedge slow requests!")
+
+
+def test_abort_before_first_chunk():
+    print("[TEST] Testing aborts while waiting for the first chunk\n")
+
+    def wait_for_disconnects(standin, count):
+        deadline = time.monotonic() + 2
+        while standin.disconnects < count and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return standin.disconnects
+
+    hung = StandInOllama(hang=True)
+    fast = StandInOllama()
+    try:
+        # Timing out closes the connection, so the server can drop the request
+        client = LLMClient([hung.url])
+        try:
+            _ask(client, "hello", timeout=0.3)
+            assert False, "expected LLMTimeout"
+        except LLMTimeout:
+            pass
+        assert wait_for_disconnects(hung, 1) == 1
+        assert client.get_stats()["endpoints"][0]["outstanding"] == 0
+
+        # So does cancelling
+        token = CancelToken()
+        threading.Timer(0.2, token.cancel).start()
+        try:
+            _ask(client, "hello again", cancel=token)
+            assert False, "expected LLMCancelled"
+        except LLMCancelled:
+            pass
+        assert wait_for_disconnects(hung, 2) == 2
+
+        # The losing hedge is cut off instead of holding the slot until the server answers
+        llm_client.LLM_HEDGE_ENABLED = True
+        client = LLMClient([hung.url, fast.url])
+        client._latencies["m:latest"] = llm_client.deque([0.05] * 20)
+        response = _ask(client, "race")
+        print(f"  Hedged reply: {response['message']['content']}")
+        assert response["message"]["content"] == "echo race"
+        assert wait_for_disconnects(hung, 3) == 3
+        print(f"  Server saw {hung.disconnects} aborted requests")
+    finally:
+        llm_client.LLM_HEDGE_ENABLED = False
+        hung.close()
+        fast.close()
+
+    print("\n[SUCCESS] Aborted calls free the server before it answers!")
+
+
+if __name__ == "__main__":
+    test_singleflight()
+    test_generation_profiles()
+    test_server_timings()
+    test_stop_when()
+    test_response_cache()
+    test_load_balancing()
+    test_deadlines_and_hedging()
+    test_abort_before_first_chunk()
@@ -0,0 +1,46 @@
+"""Test the store manifest used for fast startup"""
+import json
+import tempfile
+from pathlib import Path
+from simple_memory import SimpleMemory
+
+
+def test_manifest():
+    print("[TEST] Testing store manifest\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        memory = SimpleMemory("alice", memory_dir=base)
+        memory.add_fact("Alice likes tea", category="preferences")
+        memory.add_conversation("Hi", "Hello!")
+        memory.add_conversation("How are you?", "Great")
+        memory.add_task("Write tests")
+
+        # Reopening reads counts from the manifest without loading the store
+        reopened = SimpleMemory("alice", memory_dir=base)
+        stats = reopened.get_stats()
+        analysis = reopened.analyze_memories_for_soul()
+        print(f"  Stats: {stats}")
+        print(f"  Manifest: {reopened.manifest}")
+        assert reopened._memories is None and not reopened.archive_loaded
+        assert stats == {"hot": 4, "archive": 0, "total": 4}
+        assert analysis["conversations"] == 2 and analysis["facts"] == 1 and analysis["tasks"] == 1
+        assert analysis["knowledge_areas"] == {"preferences": 1}
+        assert reopened.interaction_count == 2
+
+        # The store still loads on first use
+        assert len(reopened.search_memory("tea")) == 1
+
+        # Edits made behind the manifest's back trigger a recount
+        data = json.loads(reopened.memory_file.read_text())
+        data.append({"id": 4, "type": "fact", "text": "Added by hand", "category": "general"})
+        reopened.memory_file.write_text(json.dumps(data))
+        rebuilt = SimpleMemory("alice", memory_dir=base)
+        assert rebuilt.get_stats()["hot"] == 5
+        assert rebuilt.analyze_memories_for_soul()["knowledge_areas"] == {"preferences": 1, "general": 1}
+
+    print("\n[SUCCESS] Manifest keeps startup free of full scans!")
+
+
+if __name__ == "__main__":
+    test_manifest()
@@ -0,0 +1,87 @@
+"""Test per-user memory partitions and the LRU memory manager"""
+import tempfile
+from pathlib import Path
+import simple_memory
+from config import SOUL_PATH
+from simple_memory import SimpleMemory, MemoryManager, partition_dir
+
+
+def test_partitions():
+    print("[TEST] Testing per-user partitions\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+
+        alice = SimpleMemory("alice", memory_dir=base)
+        bob = SimpleMemory("bob", memory_dir=base)
+        alice.add_fact("Alice likes tea")
+        bob.add_fact("Bob likes coffee")
+
+        print(f"  Alice store: {alice.memory_file}")
+        print(f"  Bob store: {bob.memory_file}")
+        assert alice.memory_file == partition_dir("alice", base) / "memories.json"
+        assert len(SimpleMemory("alice", memory_dir=base).memories) == 1
+        assert not SimpleMemory("bob", memory_dir=base).search_memory("tea")
+
+        # Default user keeps the original single-store layout
+        assert partition_dir("default_user", base) == base
+        # Users live apart from the caches, unsafe ids can't escape, and ids that sanitize alike don't collide
+        assert partition_dir("llm_cache", base).parent == base / "users"
+        assert partition_dir("../etc", base).parent == base / "users"
+        assert len({partition_dir(u, base) for u in ("a/b", "a_b", "A_b", "a.b")}) == 4
+
+        # Each partition grows its own soul, starting without anyone else's knowledge
+        soul = base / "soul.md"
+        soul.write_text("# Agent Soul\n\n**Total Interactions**: 7\n\n### Learned Knowledge\n\n"
+                        "- **secrets**: 3 facts\n\n---\n\n## Memory Statistics\n\n- **Facts Learned**: 3\n",
+                        encoding="utf-8")
+        shared = SimpleMemory(memory_dir=base, soul_path=soul)
+        alice = SimpleMemory("alice", memory_dir=base)
+        simple_memory.SOUL_PATH = soul
+        try:
+            seeded = alice.load_soul()
+            alice.add_fact("Alice plays chess", category="hobbies")
+            alice.update_soul_if_needed(force=True)
+        finally:
+            simple_memory.SOUL_PATH = SOUL_PATH
+        print(f"  Alice soul: {alice.soul_path}")
+        assert "secrets" not in seeded and "**Total Interactions**: 0" in seeded
+        assert alice.soul_path == alice.store_dir / "soul.md" and "hobbies" in alice.soul_path.read_text()
+        assert "hobbies" not in shared.load_soul() and "secrets" in shared.load_soul()
+
+    print("[SUCCESS] Partitions are isolated\n")
+
+
+def test_manager_lru():
+    print("[TEST] Testing MemoryManager LRU eviction\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = MemoryManager(max_open=2, memory_dir=Path(tmp))
+
+        manager.get("u1").add_fact("first user fact")
+        manager.get("u2")
+        manager.get("u1")          # u1 is now most recently used
+        manager.get("u3")          # evicts u2
+
+        stats = manager.get_stats()
+        print(f"  Stats: {stats}")
+        assert "u1" in manager and "u3" in manager and "u2" not in manager
+        assert stats["evicted"] == 1 and stats["hits"] == 1
+
+        # Pinned stores survive eviction pressure
+        with manager.session("u1") as memory:
+            manager.get("u4")
+            manager.get("u5")
+            assert "u1" in manager
+            memory.add_fact("added while pinned")
+        assert len(manager) == 2
+
+        # Evicted stores reopen from disk
+        assert len(manager.get("u1").memories) == 2
+
+    print("[SUCCESS] MemoryManager keeps memory bounded\n")
+
+
+if __name__ == "__main__":
+    test_partitions()
+    test_manager_lru()
@@ -0,0 +1,47 @@
+"""Test the background batched writer for network memories"""
+import tempfile
+import time
+from pathlib import Path
+from memory_writer import MemoryWriter
+from perf import get_spans
+from simple_memory import SimpleMemory
+
+
+def test_memory_writer():
+    print("[TEST] Testing batched memory writer\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = SimpleMemory("network", memory_dir=Path(tmp))
+        writer = MemoryWriter(memory, batch_size=10, interval=0.5, max_pending=25)
+        saves = get_spans().get("memory.save")
+        saves_before = saves.count if saves else 0
+
+        # Queueing never touches disk on the caller's thread
+        started = time.perf_counter()
+        accepted = [writer.add_fact(f"AgentNet post {i}", category="network_posts") for i in range(30)]
+        elapsed = time.perf_counter() - started
+        print(f"  Queued 30 facts in {elapsed * 1000:.1f}ms")
+        assert elapsed < 0.1
+
+        writer.flush()
+        stats = writer.get_stats()
+        print(f"  Stats: {stats}")
+        assert stats["written"] == accepted.count(True) and stats["dropped"] == accepted.count(False)
+        assert memory.get_stats()["hot"] == stats["written"]
+        # A handful of batched writes instead of one rewrite per fact
+        assert get_spans()["memory.save"].count - saves_before == stats["batches"] < stats["written"]
+
+        # A lone fact is written once the interval passes, and close() drains the rest
+        writer.add_fact("Late post", category="network_posts")
+        time.sleep(0.8)
+        assert memory.get_stats()["hot"] == stats["written"] + 1
+        writer.add_fact("Last post", category="network_posts")
+        writer.close()
+        reopened = SimpleMemory("network", memory_dir=Path(tmp))
+        assert reopened.get_stats()["hot"] == stats["written"] + 2
+
+    print("\n[SUCCESS] Network memories are written in batches!")
+
+
+if __name__ == "__main__":
+    test_memory_writer()
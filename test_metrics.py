@@ -0,0 +1,53 @@
+"""Test the Prometheus metrics endpoint"""
+import socket
+import urllib.request
+import metrics
+from perf import record_span
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_metrics_endpoint():
+    print("[TEST] Testing Prometheus metrics endpoint\n")
+
+    metrics.inc("agent_network_events_total", event="new_post")
+    metrics.inc("agent_network_events_total", event="new_post")
+    metrics.register_gauge("agent_memory_entries", "Memories stored, by tier",
+                           lambda: {"hot": 12, "archive": 3}, label="store")
+    metrics.register_gauge("agent_broken", "Raises on scrape", lambda: 1 / 0)
+    record_span("llm.metrics_test", 0.3)
+    record_span("chat.total", 0.4)
+
+    server = metrics.start_metrics_server(port=_free_port())
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            content_type = response.headers["Content-Type"]
+            text = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # A port that's already taken disables metrics instead of failing startup
+    with socket.socket() as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen()
+        assert metrics.start_metrics_server(port=taken.getsockname()[1], host="127.0.0.1") is None
+
+    print(text[:400] + "...")
+    assert content_type.startswith("text/plain")
+    assert 'agent_network_events_total{event="new_post"} 2' in text
+    assert 'agent_memory_entries{store="hot"} 12' in text and "agent_broken" not in text
+    assert 'agent_llm_request_duration_seconds_bucket{call_type="metrics_test",le="0.25"} 0' in text
+    assert 'agent_llm_request_duration_seconds_bucket{call_type="metrics_test",le="0.5"} 1' in text
+    assert "agent_chats_total " in text and "agent_chats_total 0" not in text
+
+    print("\n[SUCCESS] Metrics are served in Prometheus format!")
+
+
+if __name__ == "__main__":
+    test_metrics_endpoint()
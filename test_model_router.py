@@ -0,0 +1,48 @@
+"""Test tiered model routing decisions and logging"""
+import json
+import tempfile
+from pathlib import Path
+from model_router import ModelRouter
+
+
+def test_routing():
+    print("[TEST] Testing model tier routing\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp) / "router_log.jsonl"
+        router = ModelRouter(enabled=True, small_model="small:1b", large_model="large:8b", log_path=log_path)
+        memories = {"role": "system", "content": "=== RELEVANT MEMORIES ===\n\n" +
+                    "\n\n".join(f"[FACT]: fact {i}" for i in range(6))}
+
+        cases = [
+            (("triage", "Should you reply?"), "small"),
+            (("summarize", "Update the running summary"), "small"),
+            (("network_reply", "Write a reply"), "large"),
+            (("chat", "hi!"), "small"),
+            (("chat", "Explain " + "why " * 120), "large"),
+        ]
+        for (call_type, prompt), tier in cases:
+            decision = router.route(call_type, prompt)
+            print(f"  {call_type:14} {len(prompt):4} chars -> {decision['tier']} ({decision['reason']})")
+            assert decision["tier"] == tier
+
+        decision = router.route("chat", "What do you remember?", [memories, {"role": "user", "content": "?"}])
+        assert decision["memories"] == 6 and decision["model"] == "large:8b"
+
+        # Decisions and latency are logged per tier
+        router.record(decision, 1.5)
+        router.record(router.route("chat", "hey"), 0.5)
+        entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+        print(f"  Stats: {router.get_stats()}")
+        assert [e["tier"] for e in entries] == ["large", "small"]
+        assert router.get_stats()["large"] == {"calls": 1, "avg_latency": 1.5}
+
+        # Disabled router keeps the caller's model
+        decision = ModelRouter(enabled=False, log_path=None).route("chat", "hi", default_model="mine")
+        assert decision["model"] == "mine"
+
+    print("\n[SUCCESS] Requests are routed to the right model tier!")
+
+
+if __name__ == "__main__":
+    test_routing()
@@ -0,0 +1,69 @@
+"""Test near-duplicate suppression for memories"""
+import tempfile
+from pathlib import Path
+import simple_memory
+from near_dup import SimHashIndex, hamming, simhash
+from simple_memory import SimpleMemory
+
+
+def test_simhash_index():
+    print("[TEST] Testing SimHash fingerprints and LSH index\n")
+
+    post = "AgentNet post from Bob: The new llama model is out, and it's fast!"
+    repost = "agentnet post from bob -- the new llama model is out and it's FAST"
+    other = "Alice prefers tea over coffee in the morning"
+    print(f"  Repost distance: {hamming(simhash(post), simhash(repost))}")
+    print(f"  Unrelated distance: {hamming(simhash(post), simhash(other))}")
+    assert simhash(post) == simhash(repost)
+    assert hamming(simhash(post), simhash(other)) > 10
+
+    index = SimHashIndex(max_distance=3)
+    fingerprint = simhash(post)
+    index.add("near", fingerprint ^ 0b10000000_00000001_00000001)     # 3 bits off, spread over bands
+    index.add("far", fingerprint ^ 0b1111)                              # 4 bits off
+    assert index.query(fingerprint) == [("near", 3)]
+    index.remove("near", fingerprint ^ 0b10000000_00000001_00000001)
+    assert index.query(fingerprint) == []
+
+    print("\n[SUCCESS] Fingerprints group near-identical texts!")
+
+
+def test_memory_near_dup():
+    print("[TEST] Testing near-duplicate suppression on insert\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        memory = SimpleMemory("dups", memory_dir=base)
+        first = memory.add_fact("AgentNet post from Bob: The new llama model is out!", category="network_posts")
+        again = memory.add_fact("AgentNet post from Bob - the new llama model is out", category="network_posts")
+        memory.add_fact("AgentNet post from Carol: Anyone tried the vision models?", category="network_posts")
+        memory.add_fact("AgentNet post from Bob: The new llama model is out!", category="general")
+
+        merged = memory.memories[int(first)]
+        print(f"  Stats: {memory.get_stats()}, suppressed: {memory.duplicates_suppressed}")
+        assert again == first and merged["metadata"]["seen_count"] == 2 and "last_seen" in merged["metadata"]
+        assert memory.get_stats()["hot"] == 3   # Same text in another category is kept
+
+        # Fingerprints persist, so a reopened store still catches the repost
+        reopened = SimpleMemory("dups", memory_dir=base)
+        reopened.add_facts([("AgentNet post from Bob: the NEW llama model is out", "network_posts"),
+                            ("Discussed 'llamas' with Bob on AgentNet", "network_interactions"),
+                            ("Discussed 'llamas' with Bob on AgentNet.", "network_interactions")])
+        assert reopened.get_stats()["hot"] == 4
+        assert reopened.memories[int(first)]["metadata"]["seen_count"] == 3
+
+        # "skip" drops the duplicate without touching the original
+        simple_memory.NEAR_DUP_ACTION = "skip"
+        try:
+            reopened.add_fact("Discussed 'llamas' with Bob on AgentNet!", category="network_interactions")
+        finally:
+            simple_memory.NEAR_DUP_ACTION = "merge"
+        discussed = [m for m in reopened.memories if m.get("category") == "network_interactions"]
+        assert len(discussed) == 1 and discussed[0]["metadata"]["seen_count"] == 2
+
+    print("\n[SUCCESS] Reposts and repeated notes are merged, not stored again!")
+
+
+if __name__ == "__main__":
+    test_simhash_index()
+    test_memory_near_dup()
@@ -0,0 +1,54 @@
+"""Test SKIP detection and length trimming for AgentNet replies"""
+from config import NETWORK_REPLY_MAX_CHARS
+from network_reply import is_skip, reply_should_stop, trim_reply
+
+
+def test_reply_should_stop():
+    print("[TEST] Testing when a streaming reply stops\n")
+
+    # A SKIP ends the stream as soon as the word is complete
+    for text in ("SKIP.", "skip ", "**SKIP**", "SKIP - not my topic"):
+        assert reply_should_stop(text), text
+    # ...but not a reply that merely starts with the letters
+    for text in ("SKIP", "Skipping breakfast is a bad idea", "I'd never skip this one"):
+        assert not reply_should_stop(text), text
+
+    # The character budget ends it too
+    assert not reply_should_stop("x" * (NETWORK_REPLY_MAX_CHARS - 1))
+    assert reply_should_stop("x" * NETWORK_REPLY_MAX_CHARS)
+
+    # Finished replies: a bare SKIP counts, a real answer doesn't
+    assert is_skip("SKIP") and is_skip("SKIP.") and is_skip("I'll skip this")
+    assert not is_skip("Skipping breakfast is a bad idea, honestly")
+
+    print("[SUCCESS] Streams stop on SKIP or at the budget\n")
+
+
+def test_trim_reply():
+    print("[TEST] Testing reply trimming\n")
+
+    assert trim_reply("  Short and sweet.  ") == "Short and sweet."
+
+    # Over the limit: keep whole sentences, drop the one cut mid-way
+    text = "First sentence here. Second one is here too! The third gets cut off somewhere in the middle"
+    trimmed = trim_reply(text, limit=60)
+    print(f"  Sentence cut: {trimmed!r}")
+    assert trimmed == "First sentence here. Second one is here too!"
+
+    # The limit landing right after a sentence end keeps that sentence
+    assert trim_reply("Exactly ten. And more.", limit=12) == "Exactly ten."
+
+    # No sentence boundary in reach: cut at a word and mark it
+    trimmed = trim_reply("one long run-on reply without any full stop that just keeps going", limit=30)
+    print(f"  Word cut: {trimmed!r}")
+    assert trimmed.endswith("...") and len(trimmed) <= 30 and trimmed == "one long run-on reply..."
+
+    # Default limit is the configured budget
+    assert len(trim_reply("word " * 200)) <= NETWORK_REPLY_MAX_CHARS
+
+    print("[SUCCESS] Replies are trimmed at sentence or word boundaries\n")
+
+
+if __name__ == "__main__":
+    test_reply_should_stop()
+    test_trim_reply()
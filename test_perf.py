@@ -0,0 +1,52 @@
+"""Test latency histograms and phase spans"""
+import tempfile
+from pathlib import Path
+import perf
+from perf import LatencyHistogram, span, span_summary
+from simple_memory import SimpleMemory
+
+
+def test_histogram():
+    print("[TEST] Testing HDR-style latency histogram\n")
+
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):          # 1ms .. 1000ms, uniform
+        histogram.record(ms / 1000)
+
+    summary = histogram.summary()
+    print(f"  Summary: {summary}")
+    assert summary["count"] == 1000 and summary["max_ms"] == 1000.0
+    # Percentiles land within the histogram's ~3% bucket error
+    for p, expected in ((50, 500), (90, 900), (99, 990)):
+        assert expected <= histogram.percentile(p) <= expected * 1.04, p
+
+    print("\n[SUCCESS] Percentiles are accurate within bucket error!")
+
+
+def test_spans():
+    print("[TEST] Testing phase spans and trace file\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trace = Path(tmp) / "trace.jsonl"
+        perf.PERF_TRACE_PATH = str(trace)
+        try:
+            with span("test.phase"):
+                pass
+            memory = SimpleMemory("spans", memory_dir=Path(tmp))
+            memory.add_fact("Spans time memory writes")
+            memory.search_memory("spans")
+        finally:
+            perf.PERF_TRACE_PATH = ""
+
+        spans = span_summary()
+        print(f"  Phases: {sorted(spans)}")
+        assert spans["test.phase"]["count"] >= 1
+        assert {"memory.save", "memory.search"} <= set(spans)
+        assert '"span": "test.phase"' in trace.read_text()
+
+    print("\n[SUCCESS] Phases are timed and traced!")
+
+
+if __name__ == "__main__":
+    test_histogram()
+    test_spans()
@@ -0,0 +1,61 @@
+"""Test the prioritized, rate-limited AgentNet reply scheduler"""
+import asyncio
+import threading
+import time
+from reply_scheduler import ReplyScheduler
+
+
+def test_reply_scheduler():
+    print("[TEST] Testing reply scheduler\n")
+
+    async def scenario():
+        ran = []
+
+        def job(name):
+            async def run():
+                ran.append((name, time.perf_counter()))
+            return run
+
+        scheduler = ReplyScheduler(max_concurrency=1, rate_per_minute=600, burst=2, max_queue=4,
+                                   stale_after={"random": 30})
+        started = time.perf_counter()
+        scheduler.submit("random", job("random-1"))
+        scheduler.submit("random", job("random-old"), queued_at=time.time() - 60)  # Already stale
+        scheduler.submit("dm", job("dm"))
+        scheduler.submit("mention", job("mention"))
+        assert not scheduler.submit("random", job("random-overflow"))   # Full, and lowest priority
+        while scheduler.queue_depth or scheduler.running:
+            await asyncio.sleep(0.01)
+
+        order = [name for name, _ in ran]
+        print(f"  Order: {order}")
+        print(f"  Stats: {scheduler.get_stats()}")
+        assert order == ["mention", "dm", "random-1"]
+        assert scheduler.get_stats()["dropped_stale"] == 1 and scheduler.get_stats()["dropped_full"] == 1
+        # Burst of 2, then 10/s: the third reply waits for a token
+        assert ran[2][1] - started >= 0.08
+
+        # No reply starts while the user's own turn is running
+        release = threading.Event()
+
+        def user_turn():
+            with scheduler.interactive():
+                release.wait()
+
+        threading.Thread(target=user_turn).start()
+        await asyncio.sleep(0.05)
+        scheduler.submit("mention", job("during-chat"))
+        await asyncio.sleep(0.3)
+        assert len(ran) == 3
+        release.set()
+        await asyncio.sleep(0.2)
+        assert ran[-1][0] == "during-chat"
+
+        await scheduler.close()
+
+    asyncio.run(scenario())
+    print("\n[SUCCESS] Replies run by priority, within the rate limit!")
+
+
+if __name__ == "__main__":
+    test_reply_scheduler()
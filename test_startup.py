@@ -0,0 +1,53 @@
+"""Startup benchmark: heavy dependencies must stay out of the import path"""
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+
+# Modules that should only load on first LLM call / first mem0 use
+DEFERRED = ("ollama", "httpx", "mem0", "chromadb", "subprocess", "PIL")
+# Generous budget for importing simple_agent (it takes ~40ms on a dev box)
+IMPORT_BUDGET_SECONDS = 0.5
+
+
+def _importtime(code: str) -> dict:
+    """Run code under -X importtime and return {module: cumulative seconds}"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, cwd=BASE_DIR, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative) / 1_000_000
+    return modules
+
+
+def test_startup_imports():
+    print("[TEST] Testing CLI startup imports\n")
+
+    code = ("import tempfile, pathlib, simple_agent, simple_memory\n"
+            "with tempfile.TemporaryDirectory() as tmp:\n"
+            "    memory = simple_memory.SimpleMemory('startup', memory_dir=pathlib.Path(tmp))\n"
+            "    simple_agent.SimpleAgent(memory=memory)")
+    modules = _importtime(code)
+
+    total = modules["simple_agent"]
+    slowest = sorted(modules.items(), key=lambda kv: kv[1], reverse=True)[:5]
+    print(f"  import simple_agent: {total * 1000:.1f}ms")
+    print(f"  Slowest: {[(name, round(t * 1000, 1)) for name, t in slowest]}")
+
+    loaded = [name for name in DEFERRED if name in modules]
+    assert not loaded, f"Imported at startup: {loaded}"
+    assert total < IMPORT_BUDGET_SECONDS
+
+    # agent.py no longer builds mem0/Chroma (or imports ollama) just to start
+    modules = _importtime("import agent")
+    assert not [name for name in DEFERRED if name in modules]
+
+    print("\n[SUCCESS] Startup imports stay lightweight!")
+
+
+if __name__ == "__main__":
+    test_startup_imports()
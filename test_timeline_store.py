@@ -0,0 +1,45 @@
+"""Test the bounded, indexed AgentNet timeline"""
+import json
+import tempfile
+from pathlib import Path
+from timeline_store import TimelineStore
+
+
+def _post(post_id: int, agent_id: str) -> dict:
+    return {"id": post_id, "agent_id": agent_id, "agent_name": agent_id.title(), "content": f"post {post_id}"}
+
+
+def test_timeline_store():
+    print("[TEST] Testing bounded timeline store\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spill = Path(tmp) / "spill.jsonl"
+        timeline = TimelineStore(max_posts=3, spill_path=str(spill))
+        for i in range(5):
+            timeline.add(_post(i, "alice" if i % 2 == 0 else "bob"))
+
+        print(f"  Stats: {timeline.get_stats()}")
+        assert len(timeline) == 3 and [p["id"] for p in timeline] == [2, 3, 4]
+        assert timeline.get(0) is None and timeline.get(3)["agent_id"] == "bob"
+        assert [p["id"] for p in timeline.by_author("alice")] == [2, 4]
+        assert [p["id"] for p in timeline.recent(2)] == [4, 3]
+
+        # Evicted posts are spilled to disk in the background, oldest first
+        assert timeline.flush(5)
+        spilled = [json.loads(line)["id"] for line in spill.read_text().splitlines()]
+        assert spilled == [0, 1]
+
+        # Re-adding a known id updates it instead of duplicating it
+        timeline.add({**_post(3, "bob"), "content": "edited"})
+        assert len(timeline) == 3 and timeline.get(3)["content"] == "edited"
+
+        # A server timeline replaces everything, and the indexes follow
+        timeline.replace([_post(10, "carol"), _post(11, "carol")])
+        assert timeline.by_author("alice") == [] and len(timeline.by_author("carol")) == 2
+        assert timeline.get_stats() == {"posts": 2, "authors": 1, "evicted": 2}
+
+    print("\n[SUCCESS] Timeline stays bounded and indexed!")
+
+
+if __name__ == "__main__":
+    test_timeline_store()
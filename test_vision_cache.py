@@ -0,0 +1,240 @@
+"""Test the content-hash cache for vision descriptions"""
+import _thread
+import contextlib
+import io
+import shutil
+import tempfile
+import threading
+import time
+import simple_agent
+from pathlib import Path
+from llm_client import CancelToken, LLMCancelled, LLMClient, ResponseCache
+from simple_agent import SimpleAgent
+from simple_memory import SimpleMemory
+from test_llm_client import StandInOllama
+
+
+def test_vision_cache():
+    print("[TEST] Testing vision description cache\n")
+
+    standin = StandInOllama(models=("m:latest", "moondream:latest"))
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        image = base / "screenshot.png"
+        image.write_bytes(b"\x89PNG fake image bytes")
+        try:
+            agent = SimpleAgent(model="m", vision_model="moondream",
+                                memory=SimpleMemory("viewer", memory_dir=base),
+                                llm=LLMClient([standin.url], cache=ResponseCache(base / "llm", 10, 60)),
+                                vision_cache=ResponseCache(base / "vision", 10, 60))
+
+            first = agent.analyze_image(str(image), "What is this?")
+            second = agent.analyze_image(str(image), "What is this?")
+            assert first == second and len(standin.chat_requests) == 1
+
+            # Same bytes under another name still hit; the key is the content
+            copy = base / "copy.png"
+            shutil.copy(image, copy)
+            agent.analyze_image(str(copy), "What is this?")
+            assert len(standin.chat_requests) == 1
+
+            # New content or a new prompt go to the model
+            image.write_bytes(b"\x89PNG different bytes")
+            agent.analyze_image(str(image), "What is this?")
+            agent.analyze_image(str(image), "Any text?")
+            print(f"\n  Backend calls: {len(standin.chat_requests)}")
+            print(f"  Cache: {agent.vision_cache.get_stats()}")
+            assert len(standin.chat_requests) == 3
+            assert agent.vision_cache.get_stats()["hits"] == 2
+        finally:
+            standin.close()
+
+    print("\n[SUCCESS] Repeated images skip the vision model!")
+
+
+def test_analyze_images():
+    print("[TEST] Testing concurrent multi-image analysis\n")
+
+    # Each vision reply waits until all four requests are in flight at once
+    together = threading.Barrier(4)
+
+    def delay(request):
+        if request["model"] == "moondream":
+            try:
+                together.wait(5)
+            except threading.BrokenBarrierError:
+                pass
+        return 0
+
+    standin = StandInOllama(models=("m:latest", "moondream:latest"), delay=delay)
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        paths = []
+        for i in range(4):
+            paths.append(str(base / f"shot{i}.png"))
+            Path(paths[-1]).write_bytes(f"image {i}".encode())
+        try:
+            agent = SimpleAgent(model="m", vision_model="moondream",
+                                memory=SimpleMemory("viewer", memory_dir=base),
+                                llm=LLMClient([standin.url], cache=ResponseCache(base / "llm", 10, 60)),
+                                vision_cache=ResponseCache(base / "vision", 10, 60))
+            agent.show_thinking = False
+            streamed = []
+            results = agent.analyze_images(paths, "What is this?", concurrency=4,
+                                           on_result=lambda path, text: streamed.append(path))
+            print(f"  Most vision requests at once: {standin.max_active}")
+            assert [path for path, _ in results] == paths and sorted(streamed) == sorted(paths)
+            assert standin.max_active == 4 and not together.broken   # Side by side, not one after another
+
+            # Descriptions feed a single text-model turn
+            response, _, _ = agent.chat_with_images("Compare them", paths[:2], save_to_memory=False)
+            print(f"  Agent: {response[:80]}...")
+            assert "Image 2 (" in standin.chat_requests[-1]["messages"][-1]["content"]
+        finally:
+            standin.close()
+
+    print("\n[SUCCESS] Images are analyzed concurrently and answered together!")
+
+
+def test_cancel_images():
+    print("[TEST] Testing cancelled multi-image analysis\n")
+
+    # Cancel once the first two images are being described
+    cancel = CancelToken()
+
+    def delay(request):
+        if len(standin.chat_requests) == 2:
+            cancel.cancel()
+        return 0.5
+
+    standin = StandInOllama(models=("m:latest", "moondream:latest"), delay=delay)
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        paths = []
+        for i in range(6):
+            paths.append(str(base / f"shot{i}.png"))
+            Path(paths[-1]).write_bytes(f"cancel image {i}".encode())
+        try:
+            agent = SimpleAgent(model="m", vision_model="moondream",
+                                memory=SimpleMemory("viewer", memory_dir=base),
+                                llm=LLMClient([standin.url], cache=ResponseCache(base / "llm", 10, 60)),
+                                vision_cache=ResponseCache(base / "vision", 10, 60))
+            streamed = []
+            started = time.monotonic()
+            try:
+                agent.analyze_images(paths, "What is this?", concurrency=2,
+                                     on_result=lambda path, text: streamed.append(path), cancel=cancel)
+                assert False, "analyze_images should raise LLMCancelled"
+            except LLMCancelled:
+                pass
+            elapsed = time.monotonic() - started
+            print(f"  Stopped after {elapsed:.2f}s, {len(standin.chat_requests)} of {len(paths)} images sent")
+            assert len(standin.chat_requests) == 2 and not streamed   # Queued images never start
+            assert elapsed < 0.5 and agent.vision_cache.get_stats()["entries"] == 0   # Running ones are cut off
+        finally:
+            standin.close()
+
+    print("\n[SUCCESS] Cancelling stops the remaining images!")
+
+
+def test_interrupt_image_chat():
+    print("[TEST] Testing Ctrl-C during an image chat\n")
+
+    # Ctrl-C lands while the prefill runs and two of six images are being described
+    def delay(request):
+        if request["model"] == "moondream":
+            return 0.5
+        if request.get("options", {}).get("num_predict") == 1:
+            deadline = time.monotonic() + 5
+            while len(vision_requests()) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            _thread.interrupt_main()
+            return 1.0
+        return 0
+
+    standin = StandInOllama(models=("m:latest", "moondream:latest"), delay=delay)
+    vision_requests = lambda: [r for r in standin.chat_requests if r["model"] == "moondream"]
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        paths = []
+        for i in range(6):
+            paths.append(str(base / f"shot{i}.png"))
+            Path(paths[-1]).write_bytes(f"interrupt image {i}".encode())
+        simple_agent.VISION_PREFILL_ENABLED = True
+        try:
+            agent = SimpleAgent(model="m", vision_model="moondream",
+                                memory=SimpleMemory("viewer", memory_dir=base),
+                                llm=LLMClient([standin.url], cache=ResponseCache(base / "llm", 10, 60)),
+                                vision_cache=ResponseCache(base / "vision", 10, 60))
+            agent.show_thinking = False
+            streamed = []
+            started = time.monotonic()
+            response, _, _ = agent.chat_with_images("What are these?", paths, save_to_memory=False,
+                                                    on_result=lambda path, text: streamed.append(path))
+            elapsed = time.monotonic() - started
+            time.sleep(0.6)   # Long enough for queued images to show up if they still ran
+            print(f"  {response} after {elapsed:.2f}s, {len(vision_requests())} of {len(paths)} images sent")
+            assert response == "[Generation cancelled]" and elapsed < 0.5
+            assert len(vision_requests()) == 2 and not streamed
+        finally:
+            simple_agent.VISION_PREFILL_ENABLED = False
+            standin.close()
+
+    print("\n[SUCCESS] Ctrl-C stops the vision step with the turn!")
+
+
+def test_image_overlap():
+    print("[TEST] Testing vision overlapped with prompt preparation\n")
+
+    # The vision reply is held until the prefill arrives, which only happens
+    # if memories and the prompt were prepared while vision was still running
+    prefilled = threading.Event()
+    overlapped = []
+
+    def delay(request):
+        if request["model"] == "moondream":
+            overlapped.append(prefilled.wait(5))
+        elif request.get("options", {}).get("num_predict") == 1:
+            prefilled.set()
+        return 0
+
+    standin = StandInOllama(models=("m:latest", "moondream:latest"), delay=delay)
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        image = base / "photo.png"
+        image.write_bytes(b"overlap image")
+        simple_agent.VISION_PREFILL_ENABLED = True
+        try:
+            agent = SimpleAgent(model="m", vision_model="moondream",
+                                memory=SimpleMemory("viewer", memory_dir=base),
+                                llm=LLMClient([standin.url], cache=ResponseCache(base / "llm", 10, 60)),
+                                vision_cache=ResponseCache(base / "vision", 10, 60))
+            agent.show_thinking = False
+            agent.memory.add_fact("The user's cat is called Miso")
+
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                response, _, _ = agent.chat_with_image("Is this my cat?", str(image), save_to_memory=False)
+            print(f"  Vision overlapped the prefill: {overlapped}")
+
+            assert overlapped == [True]
+            assert "[TIMING]" not in output.getvalue()    # Only with VISION_SHOW_TIMINGS
+            prefill, final = standin.chat_requests[-2], standin.chat_requests[-1]
+            if prefill["model"] == "moondream":
+                prefill = standin.chat_requests[-3]
+            assert prefill["options"]["num_predict"] == 1
+            assert prefill["messages"] == final["messages"][:-1]       # Same prefix as the real call
+            assert "Miso" in str(final["messages"]) and "Vision Analysis" in final["messages"][-1]["content"]
+        finally:
+            simple_agent.VISION_PREFILL_ENABLED = False
+            standin.close()
+
+    print("\n[SUCCESS] Vision runs alongside retrieval and prefill!")
+
+
+if __name__ == "__main__":
+    test_vision_cache()
+    test_analyze_images()
+    test_cancel_images()
+    test_interrupt_image_chat()
+    test_image_overlap()
@@ -0,0 +1,144 @@
+"""Bounded AgentNet timeline with post-id and author indexes
+
+Keeps the most recent TIMELINE_MAX_POSTS posts in insertion order (an
+OrderedDict used as a ring buffer), so lookups by post id are O(1) and a busy
+network can't grow the timeline without limit. Evicted posts are dropped, or
+appended to TIMELINE_SPILL_PATH as JSON lines when that is set; the file is
+written by a background thread so event handlers on the loop never block on it.
+"""
+import json
+import queue
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from config import TIMELINE_MAX_POSTS, TIMELINE_SPILL_PATH
+
+
+class TimelineStore:
+    """Most recent posts, indexed by post id and by author"""
+
+    def __init__(self, max_posts: int = TIMELINE_MAX_POSTS, spill_path: Optional[str] = TIMELINE_SPILL_PATH):
+        """Initialize an empty timeline"""
+        self.max_posts = max(1, max_posts)
+        self.spill_path = Path(spill_path) if spill_path else None
+        self._posts: "OrderedDict[object, Dict]" = OrderedDict()  # post id -> post, oldest first
+        self._by_author: Dict[str, Dict[object, Dict]] = {}       # agent id -> {post id: post}
+        self._lock = threading.Lock()
+        self._spill_queue: "queue.Queue" = queue.Queue()
+        self._spill_thread: Optional[threading.Thread] = None
+        self.evicted = 0
+
+    def add(self, post: Dict):
+        """Add a post (a known id is updated in place), evicting the oldest beyond the limit"""
+        with self._lock:
+            self._insert(post)
+            evicted = self._evict()
+        self._spill(evicted)
+
+    def replace(self, posts: List[Dict]):
+        """Swap in a full timeline from the server"""
+        with self._lock:
+            self._posts.clear()
+            self._by_author.clear()
+            for post in posts:
+                self._insert(post)
+            evicted = self._evict()
+        self._spill(evicted)
+
+    def get(self, post_id) -> Optional[Dict]:
+        """Post with this id, if it's still in the timeline"""
+        return self._posts.get(post_id)
+
+    def by_author(self, agent_id: str) -> List[Dict]:
+        """Posts from one agent, oldest first"""
+        with self._lock:
+            return list(self._by_author.get(agent_id, {}).values())
+
+    def recent(self, limit: int = 20) -> List[Dict]:
+        """Newest posts, newest first"""
+        with self._lock:
+            return list(reversed(self._posts.values()))[:limit]
+
+    def _insert(self, post: Dict):
+        """Index a post (caller holds the lock)"""
+        post_id = post['id']
+        old = self._posts.pop(post_id, None)
+        if old is not None:
+            self._unindex(post_id, old)
+        self._posts[post_id] = post
+        self._by_author.setdefault(post.get('agent_id'), {})[post_id] = post
+
+    def _unindex(self, post_id, post: Dict):
+        """Drop a post from the author index (caller holds the lock)"""
+        author_posts = self._by_author.get(post.get('agent_id'))
+        if author_posts is not None:
+            author_posts.pop(post_id, None)
+            if not author_posts:
+                del self._by_author[post.get('agent_id')]
+
+    def _evict(self) -> List[Dict]:
+        """Pop the oldest posts beyond max_posts (caller holds the lock)"""
+        evicted = []
+        while len(self._posts) > self.max_posts:
+            post_id, post = self._posts.popitem(last=False)
+            self._unindex(post_id, post)
+            evicted.append(post)
+        self.evicted += len(evicted)
+        return evicted
+
+    def _spill(self, posts: List[Dict]):
+        """Hand evicted posts to the spill thread, if a spill file is configured"""
+        if not posts or not self.spill_path:
+            return
+        if self._spill_thread is None:
+            with self._lock:
+                if self._spill_thread is None:
+                    self._spill_thread = threading.Thread(target=self._spill_worker, daemon=True,
+                                                          name="timeline-spill")
+                    self._spill_thread.start()
+        self._spill_queue.put(posts)
+
+    def _spill_worker(self):
+        """Append queued posts to the spill file, everything waiting in one write"""
+        while True:
+            items = [self._spill_queue.get()]
+            while True:
+                try:
+                    items.append(self._spill_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            posts = [post for item in items if isinstance(item, list) for post in item]
+            if posts:
+                try:
+                    self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(self.spill_path, 'a', encoding='utf-8') as f:
+                        for post in posts:
+                            f.write(json.dumps(post, ensure_ascii=False, default=str) + "\n")
+                except OSError as e:
+                    print(f"[Timeline] Could not spill {len(posts)} posts: {e}")
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until posts evicted so far are in the spill file; False on timeout"""
+        if self._spill_thread is None:
+            return True
+        done = threading.Event()
+        self._spill_queue.put(done)
+        return done.wait(timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Timeline statistics"""
+        return {"posts": len(self._posts), "authors": len(self._by_author), "evicted": self.evicted}
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Posts oldest first (a snapshot, safe to iterate while events arrive)"""
+        with self._lock:
+            return iter(list(self._posts.values()))